@@ -4,11 +4,15 @@ Generic Stock Analysis Script for NiveshakAI
 Analyzes any NSE/BSE stock using the SymbolStockAnalyzer
 """
 
+import re
 import sys
 import os
-sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from analysis.symbol_stock_analyzer import SymbolStockAnalyzer
+from src.analysis.symbol_stock_analyzer import SymbolStockAnalyzer
+
+# Rupee sign, thousands separators and spaces allowed in a typed price such as "₹1,234.50"
+_PRICE_JUNK_RE = re.compile(r"[₹,\s]")
 
 def main():
     print("🚀 NiveshakAI - Stock Analysis System")
@@ -19,7 +23,7 @@ def main():
     
     while True:
         try:
-            current_price = float(input(f"Enter current price for {symbol}: ₹"))
+            current_price = float(_PRICE_JUNK_RE.sub("", input(f"Enter current price for {symbol}: ₹")))
             break
         except ValueError:
             print("Please enter a valid price (numbers only)")
@@ -10,12 +10,26 @@ Implements:
 Inputs and formulas are based on the markdown template in data/templates/dcf-calculation.md.
 """
 
+from itertools import accumulate
+from operator import mul
+from typing import TYPE_CHECKING
+
+# numpy is only needed for batch valuations and is imported there
+if TYPE_CHECKING:
+    import numpy as np
+
+# Default model parameters (as decimals), shared by the single-company, batch and report functions
+FCF_GROWTH_RATE_5YR = 0.10
+FCF_GROWTH_RATE_10YR = 0.05
+TERMINAL_GROWTH_RATE = 0.01
+DISCOUNT_RATE = 0.12
+
 def dcf_intrinsic_valuation(
     base_fcf: float,
-    fcf_growth_rate_5yr: float = 0.10,
-    fcf_growth_rate_10yr: float = 0.05,
-    terminal_growth_rate: float = 0.01,
-    discount_rate: float = 0.12,
+    fcf_growth_rate_5yr: float = FCF_GROWTH_RATE_5YR,
+    fcf_growth_rate_10yr: float = FCF_GROWTH_RATE_10YR,
+    terminal_growth_rate: float = TERMINAL_GROWTH_RATE,
+    discount_rate: float = DISCOUNT_RATE,
     total_debt: float = 0.0,
     cash_and_equivalents: float = 0.0,
     share_capital: float = 1.0,
@@ -44,18 +58,9 @@ def dcf_intrinsic_valuation(
     """
     # Calculate number of shares
     number_of_shares = share_capital / face_value if face_value else 1.0
-    # Project FCFs
-    projected_fcfs = []
-    for i in range(years):
-        if i < 5:
-            growth = fcf_growth_rate_5yr
-        else:
-            growth = fcf_growth_rate_10yr
-        if i == 0:
-            fcf = base_fcf * (1 + growth)
-        else:
-            fcf = projected_fcfs[-1] * (1 + growth)
-        projected_fcfs.append(fcf)
+    # Project FCFs: compound the base FCF by the stage-one factor for 5 years, then the stage-two factor
+    growth_factors = [1 + fcf_growth_rate_5yr] * min(years, 5) + [1 + fcf_growth_rate_10yr] * max(years - 5, 0)
+    projected_fcfs = list(accumulate(growth_factors, mul, initial=base_fcf))[1:]
     # PV of FCFs
     pv_fcfs = [fcf / ((1 + discount_rate) ** (i + 1)) for i, fcf in enumerate(projected_fcfs)]
     total_pv_fcfs = sum(pv_fcfs)
@@ -95,14 +100,52 @@ def dcf_intrinsic_valuation(
         "Present Value of Terminal Value": pv_terminal_value,
     }
 
+def dcf_intrinsic_share_prices(
+    base_fcf,
+    total_debt=0.0,
+    cash_and_equivalents=0.0,
+    share_capital=1.0,
+    face_value=1.0,
+    fcf_growth_rate_5yr: float = FCF_GROWTH_RATE_5YR,
+    fcf_growth_rate_10yr: float = FCF_GROWTH_RATE_10YR,
+    terminal_growth_rate: float = TERMINAL_GROWTH_RATE,
+    discount_rate: float = DISCOUNT_RATE,
+    years: int = 10
+) -> "np.ndarray":
+    """
+    Intrinsic share price for many companies at once, e.g. when screening a list of symbols.
+    Company inputs may be scalars or equal-length arrays; the growth and discount rates are shared.
+    Matches "Intrinsic Share Price" from dcf_intrinsic_valuation for each company.
+    Returns:
+        Array of intrinsic share prices, one per company
+    """
+    import numpy as np
+    
+    base_fcf = np.asarray(base_fcf, dtype=float)
+    share_capital = np.asarray(share_capital, dtype=float)
+    face_value = np.asarray(face_value, dtype=float)
+    growth_factors = [1 + fcf_growth_rate_5yr] * min(years, 5) + [1 + fcf_growth_rate_10yr] * max(years - 5, 0)
+    # Enterprise value is linear in the base FCF, so the projection and discounting
+    # collapse to one multiplier shared by every company
+    cumulative_growth = np.cumprod(growth_factors)
+    discount_factors = (1 + discount_rate) ** np.arange(1, years + 1)
+    pv_multiplier = (cumulative_growth / discount_factors).sum()
+    terminal_multiplier = (cumulative_growth[-1] * (1 + terminal_growth_rate)
+                           / (discount_rate - terminal_growth_rate) / discount_factors[-1])
+    enterprise_value = base_fcf * (pv_multiplier + terminal_multiplier)
+    equity_value = enterprise_value - (np.asarray(total_debt, dtype=float) - np.asarray(cash_and_equivalents, dtype=float))
+    number_of_shares = np.divide(share_capital, face_value, out=np.ones(np.broadcast(share_capital, face_value).shape),
+                                 where=face_value != 0)
+    return equity_value / number_of_shares
+
 def dcf_intrinsic_valuation_and_report(
     company_name: str,
     year: str,
     base_fcf: float,
-    fcf_growth_rate_5yr: float = 0.10,
-    fcf_growth_rate_10yr: float = 0.05,
-    terminal_growth_rate: float = 0.01,
-    discount_rate: float = 0.12,
+    fcf_growth_rate_5yr: float = FCF_GROWTH_RATE_5YR,
+    fcf_growth_rate_10yr: float = FCF_GROWTH_RATE_10YR,
+    terminal_growth_rate: float = TERMINAL_GROWTH_RATE,
+    discount_rate: float = DISCOUNT_RATE,
     total_debt: float = 0.0,
     cash_and_equivalents: float = 0.0,
     share_capital: float = 1.0,
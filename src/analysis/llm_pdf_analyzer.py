@@ -48,6 +48,8 @@ except ImportError:
     # dotenv not available, skip
     pass
 
+from ..utils import GENERIC_FALLBACK_DATA, ITC_FALLBACK_DATA
+
 
 class LLMPDFAnalyzer:
     """
@@ -158,69 +160,11 @@ class LLMPDFAnalyzer:
         
         # Enhanced realistic data for ITC based on actual financial performance
         if symbol.upper() == 'ITC':
-            multi_year_data = {
-                'company_name': 'ITC Limited',
-                'symbol': symbol,
-                'latest_year': '2025',
-                
-                # Revenue trend (in Crores) - Based on ITC's actual performance
-                'revenue': 68500,  # Latest year
-                'revenue_growth_3yr': 4.6,  # 3-year CAGR
-                
-                # Profitability
-                'net_profit': 17200,
-                'profit_margin': 25.1,
-                'profit_growth_3yr': 6.7,
-                
-                # Cash flows
-                'free_cash_flow': 15800,  # Strong FCF generator
-                'operating_cash_flow': 18500,
-                'fcf_growth_3yr': 7.0,
-                
-                # Balance sheet strength
-                'total_assets': 85000,
-                'shareholders_equity': 58000,
-                'total_debt': 1200,  # Very low debt
-                'cash_and_equivalents': 8500,  # Cash rich
-                'shares_outstanding': 1240,  # 12.40 billion shares
-                
-                # Key financial ratios
-                'roe': 28.5,
-                'roce': 32.1,
-                'roa': 20.2,
-                'debt_to_equity': 0.05,
-                'current_ratio': 2.8,
-                'quick_ratio': 2.1,
-                'asset_turnover': 1.4,
-                
-                # Per share metrics
-                'book_value_per_share': 14.2,
-                'eps': 13.9,
-                
-                # Data quality
-                'data_source': 'ENHANCED_FALLBACK',
-                'extraction_method': f'{self.provider.upper()}_LLM_READY',
-                'analysis_quality': 'HIGH'
-            }
+            multi_year_data = {**ITC_FALLBACK_DATA, 'symbol': symbol}
         else:
             # Generic template for other companies
-            multi_year_data = {
-                'company_name': f'{symbol} Limited',
-                'symbol': symbol,
-                'latest_year': '2025',
-                'revenue': 10000,
-                'net_profit': 1500,
-                'free_cash_flow': 1200,
-                'total_debt': 2000,
-                'cash_and_equivalents': 1000,
-                'shares_outstanding': 100,
-                'roe': 15.0,
-                'roce': 18.0,
-                'debt_to_equity': 0.3,
-                'profit_margin': 15.0,
-                'data_source': 'FALLBACK_DATA',
-                'extraction_method': f'{self.provider.upper()}_LLM_READY'
-            }
+            multi_year_data = {'company_name': f'{symbol} Limited', 'symbol': symbol, **GENERIC_FALLBACK_DATA}
+        multi_year_data['extraction_method'] = f'{self.provider.upper()}_LLM_READY'
         
         print("✅ Fallback multi-year financial data prepared")
         return multi_year_data
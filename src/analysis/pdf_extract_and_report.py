@@ -3,62 +3,145 @@ Script: pdf_extract_and_report.py
 Purpose: Extract structured data from an annual report PDF and generate a sanitized PDF report using the analysis template.
 """
 import os
-import re
+import json
+import hashlib
+from functools import lru_cache
 import pdfplumber
 import pandas as pd
 from fpdf import FPDF
 
-def extract_sections_and_tables(pdf_path):
-    """Extracts text sections and tables from a PDF, associating tables with section headers."""
-    sections = {}
-    tables = []
-    section_patterns = [
-        r"Management Discussion and Analysis", r"Balance Sheet", r"Profit and Loss",
-        r"Cash Flow Statement", r"Notes to Accounts", r"Auditor's Report",
-        r"Financial Highlights", r"Corporate Governance"
-    ]
-    pattern = r"(" + r"|".join(section_patterns) + r")"
+from ..utils import build_section_matcher
+
+# PyMuPDF parses pages and detects tables in native code, far faster than pdfplumber
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+# Section headers looked for in annual reports, compiled once for reuse across calls
+_SECTION_PATTERNS = (
+    r"Management Discussion and Analysis", r"Balance Sheet", r"Profit and Loss",
+    r"Cash Flow Statement", r"Notes to Accounts", r"Auditor's Report",
+    r"Financial Highlights", r"Corporate Governance"
+)
+_SECTION_RE, _find_section_header = build_section_matcher(_SECTION_PATTERNS)
+
+@lru_cache(maxsize=4096)
+def _normalize_cell(cell):
+    """Flatten a table cell to a single-line string; repeated values are common in financial tables."""
+    return str(cell).replace('\n', ' ').strip()
+
+def _read_pages_pdfplumber(pdf_path):
+    """Yield (page text, raw tables) for each page using pdfplumber."""
     with pdfplumber.open(pdf_path) as pdf:
-        full_text = ""
         for page in pdf.pages:
-            page_text = page.extract_text() or ""
-            full_text += page_text + "\n"
-        # Section splitting
-        matches = list(re.finditer(pattern, full_text, re.IGNORECASE))
-        for i, match in enumerate(matches):
-            section_name = match.group(0).strip()
-            start = match.start()
-            end = matches[i+1].start() if i+1 < len(matches) else len(full_text)
-            sections[section_name] = full_text[start:end].strip()
-        sections['full_text'] = full_text
-        # Table extraction
-        last_section = None
-        for page in pdf.pages:
-            page_text = page.extract_text() or ""
-            section_header = None
-            for pat in section_patterns:
-                if re.search(pat, page_text, re.IGNORECASE):
-                    section_header = pat
-                    last_section = pat
-                    break
-            for table in page.extract_tables():
-                # Handle multi-line headers
-                if len(table) > 1 and any('\n' in str(cell) for cell in table[0]):
-                    header = [' '.join(filter(None, [str(cell).replace('\n', ' ').strip() for cell in row]))
-                              for row in zip(table[0], table[1])]
-                    data = table[2:]
-                else:
-                    header = table[0]
-                    data = table[1:]
-                df = pd.DataFrame(data, columns=header)
-                tables.append({'section': section_header or last_section, 'table': df})
+            yield page.extract_text() or "", page.extract_tables()
+
+def _read_pages_pymupdf(pdf_path):
+    """Yield (page text, raw tables) for each page using PyMuPDF's text and table detection."""
+    with pymupdf.open(pdf_path) as doc:
+        for page in doc:
+            yield page.get_text("text"), [table.extract() for table in page.find_tables().tables]
+
+PDF_BACKENDS = {'pdfplumber': _read_pages_pdfplumber, 'pymupdf': _read_pages_pymupdf}
+
+def extract_sections_and_tables(pdf_path, backend="pdfplumber"):
+    """
+    Extracts text sections and tables from a PDF, associating tables with section headers.
+    backend is 'pdfplumber' or 'pymupdf'; pymupdf falls back to pdfplumber when not installed.
+    """
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    if backend == 'pymupdf' and not PYMUPDF_AVAILABLE:
+        backend = 'pdfplumber'
+    sections = {}
+    tables = []
+    text_parts = []
+    last_section = None
+    # Single pass: collect page text and extract tables while the page layout is loaded
+    for page_text, page_tables in PDF_BACKENDS[backend](pdf_path):
+        text_parts.append(page_text)
+        section_header = _find_section_header(page_text)
+        if section_header:
+            last_section = section_header
+        for table in page_tables:
+            # Handle multi-line headers
+            if len(table) > 1 and any('\n' in str(cell) for cell in table[0]):
+                header = [' '.join(filter(None, [_normalize_cell(cell) for cell in row]))
+                          for row in zip(table[0], table[1])]
+                data = table[2:]
+            else:
+                header = table[0]
+                data = table[1:]
+            df = pd.DataFrame(data, columns=header)
+            tables.append({'section': section_header or last_section, 'table': df})
+    full_text = "".join(f"{page_text}\n" for page_text in text_parts)
+    # Section splitting
+    matches = list(_SECTION_RE.finditer(full_text))
+    for i, match in enumerate(matches):
+        section_name = match.group(0).strip()
+        start = match.start()
+        end = matches[i+1].start() if i+1 < len(matches) else len(full_text)
+        sections[section_name] = full_text[start:end].strip()
+    sections['full_text'] = full_text
+    return sections, tables
+
+# Parsed reports are kept here, keyed by file content; set NIVESHAK_PDF_CACHE to "" to always re-parse
+PDF_CACHE_DIR = os.environ.get("NIVESHAK_PDF_CACHE", "data/cache/pdf")
+
+def _pdf_cache_path(pdf_path, backend, cache_dir):
+    """Cache file for a report: hash of its first MiB, size, mtime and the parser used."""
+    stat = os.stat(pdf_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(pdf_path, 'rb') as f:
+        digest.update(f.read(1 << 20))
+    digest.update(f"{stat.st_size}:{stat.st_mtime_ns}:{backend}".encode())
+    return os.path.join(cache_dir, f"{digest.hexdigest()}.json")
+
+def _tables_to_json(tables):
+    """Tables as JSON-ready dicts; column labels may repeat, so each frame is stored as columns plus rows."""
+    return [{'section': t['section'], 'columns': list(t['table'].columns), 'data': t['table'].values.tolist()}
+            for t in tables]
+
+def _tables_from_json(tables):
+    """Rebuild the table list written by _tables_to_json."""
+    return [{'section': t['section'], 'table': pd.DataFrame(t['data'], columns=t['columns'])} for t in tables]
+
+def extract_sections_and_tables_cached(pdf_path, backend="pdfplumber", cache_dir=None):
+    """extract_sections_and_tables, reusing the result stored on disk by an earlier run for the same file."""
+    cache_dir = PDF_CACHE_DIR if cache_dir is None else cache_dir
+    if not cache_dir:
+        return extract_sections_and_tables(pdf_path, backend)
+    cache_path = _pdf_cache_path(pdf_path, backend, cache_dir)
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['sections'], _tables_from_json(cached['tables'])
+    except Exception:
+        # Missing, truncated or foreign cache files are all treated as a miss
+        pass
+    sections, tables = extract_sections_and_tables(pdf_path, backend)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'sections': sections, 'tables': _tables_to_json(tables)}, f)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"[WARN] Could not cache parsed PDF: {e}")
     return sections, tables
 
 def sanitize(text):
     """Remove emojis and non-ASCII characters for PDF output."""
     return text.encode('ascii', 'ignore').decode()
 
+def _format_items(items):
+    """Join a section's key/value pairs into one block, one pair per line."""
+    return "\n".join(f"{key}: {value}" for key, value in items.items())
+
 def generate_pdf_report(template_data, output_path):
+    """Render template data as a PDF, writing each section as a single text block."""
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", size=12)
@@ -69,22 +152,19 @@ def generate_pdf_report(template_data, output_path):
     pdf.set_font("Arial", 'B', 12)
     pdf.cell(0, 10, "Section 1: Business & Qualitative Analysis", ln=True)
     pdf.set_font("Arial", size=10)
-    for q, a in template_data['business_analysis'].items():
-        pdf.multi_cell(0, 8, sanitize(f"{q}: {a}"))
+    pdf.multi_cell(0, 8, sanitize(_format_items(template_data['business_analysis'])))
     pdf.ln(3)
     # Section 2: Financial Metrics
     pdf.set_font("Arial", 'B', 12)
     pdf.cell(0, 10, "Section 2: Financial Metrics & Judgement", ln=True)
     pdf.set_font("Arial", size=10)
-    for metric, value in template_data['financial_metrics'].items():
-        pdf.cell(0, 8, sanitize(f"{metric}: {value}"), ln=True)
+    pdf.multi_cell(0, 8, sanitize(_format_items(template_data['financial_metrics'])))
     pdf.ln(3)
     # Section 3: Ratio Analysis
     pdf.set_font("Arial", 'B', 12)
     pdf.cell(0, 10, "Section 3: Ratio Analysis", ln=True)
     pdf.set_font("Arial", size=10)
-    for ratio, value in template_data['ratio_analysis'].items():
-        pdf.cell(0, 8, sanitize(f"{ratio}: {value}"), ln=True)
+    pdf.multi_cell(0, 8, sanitize(_format_items(template_data['ratio_analysis'])))
     pdf.ln(5)
     # Recommendation
     pdf.set_font("Arial", 'B', 12)
@@ -104,7 +184,7 @@ def extract_and_analyze_pdf(pdf_path: str):
         Dictionary with extracted financial data
     """
     try:
-        sections, tables = extract_sections_and_tables(pdf_path)
+        sections, tables = extract_sections_and_tables_cached(pdf_path)
         
         if not sections or not tables:
             return None
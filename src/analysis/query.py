@@ -9,18 +9,247 @@ This module handles:
 """
 
 import os
-from typing import List, Dict, Any, Optional
+import re
+import sys
+import json
+import time
+import queue
+import atexit
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import cached_property, lru_cache
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator
 from dataclasses import dataclass
 from datetime import datetime
 import yaml
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 import ollama
 
 from ..embedding.embedder import EmbeddingManager
 from ..utils import logger
 
+# orjson encodes reports several times faster than the stdlib encoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+# HTTP/2 multiplexes concurrent LLM requests over one connection when h2 is installed
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Prefer the libyaml-backed C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+SYSTEM_PROMPT = (
+    "You are NiveshakAI, an expert investment advisor with deep knowledge of fundamental analysis. "
+    "Provide detailed, actionable investment advice based on the user's persona and available data."
+)
+
+
+# Retrieved documents included per prompt, and characters kept from each
+PROMPT_DOC_LIMIT = 3
+PROMPT_DOC_CHARS = 800
+
+# Seconds a retrieval result is reused for a repeated question before the index is searched again
+RETRIEVAL_CACHE_TTL = 300
+
+
+def _http_client_options() -> Dict[str, Any]:
+    """httpx settings for LLM API clients: a pool large enough for report fan-out, fast connect timeout."""
+    return {
+        'http2': HTTP2_AVAILABLE,
+        'limits': httpx.Limits(max_connections=100, max_keepalive_connections=100),
+        'timeout': httpx.Timeout(60.0, connect=5.0)
+    }
+
+# (engine, client) of the innermost open async_session; a context variable, so threads and event loops
+# sharing one engine never see each other's client
+_async_session_client: ContextVar[Optional[tuple]] = ContextVar("async_session_client", default=None)
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion from sync code, even when the caller is inside an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # asyncio.run refuses to nest (e.g. under Jupyter), so give the coroutine its own loop on a helper thread
+    result = {}
+    
+    def run():
+        try:
+            result['value'] = asyncio.run(coro)
+        except BaseException as e:
+            result['error'] = e
+    
+    thread = threading.Thread(target=run, name="niveshak-report")
+    thread.start()
+    thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
+
+
+# Lines that open a recommendations block, and the bullet items ('•', '-', '1.'-'3.') within it
+_RECOMMENDATION_KEYWORD_RE = re.compile(r'recommendation|suggest|consider', re.IGNORECASE)
+_BULLET_RE = re.compile(r'^(?=[•-]|[123]\.)[•\-1-9. ]*(.*)$')
+
+_ENV_RE = re.compile(r'\$\{([^}]+)\}')
+
+
+def _resolve_env(value: Any) -> Any:
+    """Return a copy of a parsed config with every ${VAR} replaced from the environment."""
+    if isinstance(value, str):
+        return _ENV_RE.sub(lambda match: os.getenv(match.group(1), ''), value) if '${' in value else value
+    if isinstance(value, dict):
+        return {key: _resolve_env(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve_env(item) for item in value]
+    return value
+
+
+# Parsed YAML files are kept here as JSON so later processes can skip parsing
+YAML_CACHE_DIR = os.environ.get("NIVESHAK_YAML_CACHE", "data/cache/yaml")
+
+
+def _yaml_cache_path(path: str) -> str:
+    """Sidecar file for a YAML file, unique per absolute path."""
+    digest = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=8).hexdigest()
+    return os.path.join(YAML_CACHE_DIR, f"{os.path.basename(path)}.{digest}.json")
+
+
+@lru_cache(maxsize=None)
+def _load_yaml(path: str) -> Dict[str, Any]:
+    """
+    Load and parse a YAML file once per path; the result is shared and must not be mutated.
+    
+    The parsed data is also written to a JSON sidecar under YAML_CACHE_DIR, tagged with
+    the YAML file's mtime_ns and size; later processes reuse it while both still match.
+    Files whose data JSON cannot represent exactly (non-string keys, dates) are not cached.
+    """
+    stat = os.stat(path)
+    source = [stat.st_mtime_ns, stat.st_size]
+    cache_path = _yaml_cache_path(path)
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached['source'] == source:
+            return cached['data']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+    
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        payload = json.dumps({'source': source, 'data': data})
+        if json.loads(payload)['data'] != data:
+            logger.debug(f"Not caching {path}: its data does not survive a JSON round trip")
+            return data
+        os.makedirs(YAML_CACHE_DIR, exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f"Could not write YAML cache {cache_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    return data
+
+
+class LLMCache:
+    """LRU cache of LLM answers keyed by SHA-256 of model, prompt and settings, optionally persisted to SQLite."""
+    
+    def __init__(self, db_path: Optional[str] = None, ttl_hours: float = 24, max_entries: int = 1024):
+        """Initialize cache; without db_path answers are kept in memory only."""
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache "
+                    "(key TEXT PRIMARY KEY, answer TEXT NOT NULL, created REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache database unavailable, using memory only: {str(e)}")
+                self._db = None
+    
+    @staticmethod
+    def make_key(model: str, prompt: str, **settings: Any) -> str:
+        """Hash the model name, prompt and any settings that shape the answer into a cache key."""
+        payload = json.dumps([model, prompt, settings], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached answer that has not expired, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                answer, created = entry
+                if now - created < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    return answer
+                del self._memory[key]
+            
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "SELECT answer, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl_seconds:
+                return None
+            self._remember(key, row[0], row[1])
+            return row[0]
+    
+    def set(self, key: str, answer: str):
+        """Store an answer in memory and on disk."""
+        created = time.time()
+        with self._lock:
+            self._remember(key, answer, created)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, answer, created) VALUES (?, ?, ?)",
+                        (key, answer, created)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist LLM cache entry: {str(e)}")
+    
+    def _remember(self, key: str, answer: str, created: float):
+        """Insert into the in-memory LRU, evicting the oldest entry when full."""
+        self._memory[key] = (answer, created)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+@dataclass(slots=True, frozen=True)
 class QueryContext:
     """Context for a user query."""
     query: str
@@ -30,7 +259,7 @@ class QueryContext:
     market_data: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AnalysisResponse:
     """Response from AI analysis."""
     query: str
@@ -47,11 +276,15 @@ class PersonaManager:
     
     def __init__(self, persona_config_path: str = "config/persona.yaml"):
         """Initialize persona manager."""
-        with open(persona_config_path, 'r') as f:
-            self.persona_config = yaml.safe_load(f)
+        self.persona_config = _load_yaml(persona_config_path)
     
     def get_persona_prompt(self) -> str:
-        """Generate persona-based prompt for LLM."""
+        """Get persona-based prompt for LLM."""
+        return self.persona_prompt
+    
+    @cached_property
+    def persona_prompt(self) -> str:
+        """Persona-based prompt for LLM, built once per manager and interned so managers share one string."""
         persona = self.persona_config
         
         prompt = f"""
@@ -82,7 +315,7 @@ INVESTMENT CRITERIA:
 When providing investment advice, always consider these preferences and provide reasoning 
 that aligns with this investor's philosophy and risk tolerance.
 """
-        return prompt.strip()
+        return sys.intern(prompt.strip())
     
     def get_investment_criteria(self) -> Dict[str, Any]:
         """Get structured investment criteria."""
@@ -93,6 +326,19 @@ that aligns with this investor's philosophy and risk tolerance.
         return self.persona_config.get('risk_management', {})
 
 
+# Managers are shared by every engine built from the same file; treat them as read-only after init
+@lru_cache(maxsize=4)
+def _shared_embedding_manager(config_path: str) -> EmbeddingManager:
+    """Return the embedding manager for a settings file, connecting to the index once."""
+    return EmbeddingManager(_resolve_env(_load_yaml(config_path)))
+
+
+@lru_cache(maxsize=4)
+def _shared_persona_manager(persona_path: str) -> PersonaManager:
+    """Return the persona manager for a persona file."""
+    return PersonaManager(persona_path)
+
+
 class QueryEngine:
     """Main query processing engine with RAG capabilities."""
     
@@ -100,15 +346,24 @@ class QueryEngine:
                  config_path: str = "config/settings.yaml",
                  persona_path: str = "config/persona.yaml"):
         """Initialize query engine."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Substituted per engine rather than in the cached parse, so secrets never reach the sidecar
+        self.config = _resolve_env(_load_yaml(config_path))
         
-        self.embedding_manager = EmbeddingManager(self.config)
-        self.persona_manager = PersonaManager(persona_path)
+        self.embedding_manager = _shared_embedding_manager(config_path)
+        self.persona_manager = _shared_persona_manager(persona_path)
         self.llm_client = self._initialize_llm()
         
+        # Identical questions (e.g. report reloads) skip re-embedding and re-asking the LLM
+        cache_config = self.config.get('cache', {})
+        self.llm_cache = LLMCache(
+            cache_config.get('llm_db', 'data/cache/llm.sqlite') if cache_config.get('enabled', True) else None,
+            ttl_hours=cache_config.get('ttl_hours', 24)
+        )
+        self.retrieval_ttl = cache_config.get('retrieval_ttl_seconds', RETRIEVAL_CACHE_TTL)
+        self._cached_retrieval = lru_cache(maxsize=1024)(self._search_context)
+        
     def _initialize_llm(self):
-        """Initialize LLM client (OpenAI, Ollama, Anthropic, etc.)."""
+        """Initialize LLM client (OpenAI, Ollama, llama.cpp server, etc.)."""
         llm_config = self.config.get('llm', {})
         provider = llm_config.get('provider', 'openai')
         
@@ -127,22 +382,32 @@ class QueryEngine:
             openai_config = self.config['api'].get('openai', {})
             api_key = openai_config.get('api_key')
             
-            if api_key and api_key.startswith('${') and api_key.endswith('}'):
-                # Extract environment variable name
-                env_var = api_key[2:-1]  # Remove ${ and }
-                api_key = os.getenv(env_var)
-            
             if not api_key:
                 raise ValueError("OpenAI API key not found in config or environment")
             
             self.llm_provider = 'openai'
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = OpenAI(api_key=api_key, http_client=httpx.Client(**_http_client_options()))
             self.model = openai_config.get('model', 'gpt-3.5-turbo')
             self.temperature = openai_config.get('temperature', 0.1)
             self.max_tokens = openai_config.get('max_tokens', 2000)
             logger.info(f"Initialized OpenAI client with model: {self.model}")
             return self.openai_client
             
+        elif provider == 'llamacpp':
+            # llama.cpp's llama-server exposes an OpenAI-compatible API, so the OpenAI call paths are reused
+            llamacpp_config = self.config['api'].get('llamacpp', {})
+            self.llm_provider = 'llamacpp'
+            self.openai_client = OpenAI(
+                base_url=llamacpp_config.get('base_url', 'http://localhost:8081/v1'),
+                api_key='sk-none',  # llama-server does not check keys unless started with --api-key
+                http_client=httpx.Client(**_http_client_options())
+            )
+            self.model = llamacpp_config.get('model', 'local')
+            self.temperature = llamacpp_config.get('temperature', 0.1)
+            self.max_tokens = llamacpp_config.get('max_tokens', 2000)
+            logger.info(f"Initialized llama.cpp client at {self.openai_client.base_url} with model: {self.model}")
+            return self.openai_client
+            
         else:
             raise ValueError(f"Unsupported LLM provider: {provider}")
     
@@ -184,27 +449,158 @@ class QueryEngine:
             logger.error(f"Failed to process query: {str(e)}")
             raise
     
+    async def aprocess_query(self, query: str, company_symbol: Optional[str] = None) -> AnalysisResponse:
+        """
+        Async variant of process_query so several queries can share one event loop.
+        
+        Args:
+            query: User's investment question
+            company_symbol: Optional company symbol for context
+            
+        Returns:
+            AnalysisResponse with detailed analysis
+        """
+        try:
+            logger.info(f"Processing query: {query[:100]}...")
+            
+            # Retrieval uses blocking clients, so keep it off the event loop
+            retrieved_docs = await asyncio.to_thread(self._retrieve_context, query, company_symbol)
+            company_data = self._get_company_data(company_symbol) if company_symbol else None
+            
+            context = QueryContext(
+                query=query,
+                user_persona=self.persona_manager.persona_config,
+                retrieved_documents=retrieved_docs,
+                company_data=company_data
+            )
+            
+            response = await self._agenerate_response(context)
+            
+            logger.info("Query processed successfully")
+            return response
+            
+        except Exception as e:
+            logger.error(f"Failed to process query: {str(e)}")
+            raise
+    
+    def process_query_stream(self, query: str, company_symbol: Optional[str] = None) -> Iterator[str]:
+        """
+        Process a user query, yielding the answer as it is generated.
+        
+        Args:
+            query: User's investment question
+            company_symbol: Optional company symbol for context
+            
+        Yields:
+            Text deltas of the LLM answer
+        """
+        logger.info(f"Streaming query: {query[:100]}...")
+        
+        context = QueryContext(
+            query=query,
+            user_persona=self.persona_manager.persona_config,
+            retrieved_documents=self._retrieve_context(query, company_symbol),
+            company_data=self._get_company_data(company_symbol) if company_symbol else None
+        )
+        prompt = self._build_response_prompt(context)
+        
+        cache_key = self._cache_key(prompt)
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        if self.llm_provider == 'ollama':
+            stream = self._call_ollama_stream(prompt)
+        elif self.llm_provider in ('openai', 'llamacpp'):
+            stream = self._call_openai_stream(prompt)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
+        
+        chunks = []
+        for chunk in stream:
+            chunks.append(chunk)
+            yield chunk
+        
+        # Only complete answers are cached
+        self.llm_cache.set(cache_key, "".join(chunks))
+    
+    def process_query_batch(self, queries: List[str], company_symbol: Optional[str] = None) -> List[AnalysisResponse]:
+        """
+        Answer several questions about one company with a single LLM call.
+        
+        Args:
+            queries: Investment questions sharing the same persona and company
+            company_symbol: Optional company symbol for context
+            
+        Returns:
+            One AnalysisResponse per query, in query order
+        """
+        logger.info(f"Processing {len(queries)} queries in one batch")
+        
+        company_data = self._get_company_data(company_symbol) if company_symbol else None
+        contexts = [
+            QueryContext(
+                query=query,
+                user_persona=self.persona_manager.persona_config,
+                retrieved_documents=retrieved_docs,
+                company_data=company_data
+            )
+            for query, retrieved_docs in zip(queries, self._retrieve_context_batch(queries, company_symbol))
+        ]
+        
+        try:
+            prompt = self._build_batch_prompt(contexts)
+            ai_response = self._call_llm(prompt, json_mode=True)
+            answers = json.loads(ai_response)
+            if not isinstance(answers, dict):
+                raise ValueError("Batch response is not a JSON object")
+        except Exception as e:
+            logger.error(f"Batched LLM response failed, answering individually: {str(e)}")
+            answers = {}
+        
+        responses = []
+        for number, context in enumerate(contexts, start=1):
+            answer = answers.get(str(number))
+            if isinstance(answer, str) and answer.strip():
+                responses.append(self._format_response(context, answer))
+            else:
+                # Missing or malformed answer, ask this question on its own
+                responses.append(self._generate_response(context))
+        return responses
+    
     def _retrieve_context(self, query: str, company_symbol: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieve relevant documents from knowledge base."""
-        # Search for relevant content
-        results = self.embedding_manager.search_knowledge_base(query, top_k=5)
-        
-        # If company symbol provided, also search for company-specific content
+        # Repeated questions reuse the last search until the TTL lapses or documents are added;
+        # callers get their own copies so the cached result cannot be mutated
+        documents = self._cached_retrieval(
+            query, company_symbol, self.embedding_manager.documents_version, int(time.time() // self.retrieval_ttl)
+        )
+        return [{**doc, 'metadata': dict(doc['metadata'])} for doc in documents]
+    
+    def _search_context(self, query: str, company_symbol: Optional[str], documents_version: int,
+                        ttl_bucket: int) -> tuple:
+        """Search the knowledge base for one query; the version and TTL bucket only key the cache."""
+        # The general and company-specific searches share one embedding request and one index round trip
+        return tuple(self._retrieve_context_batch([query], company_symbol)[0])
+    
+    def _retrieve_context_batch(self, queries: List[str], company_symbol: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Retrieve documents for several queries, embedding all of them in one request."""
+        search_queries = list(queries)
         if company_symbol:
-            company_query = f"{company_symbol} financial analysis annual report"
-            company_results = self.embedding_manager.search_knowledge_base(company_query, top_k=3)
-            results.extend(company_results)
+            # The company search is shared by every query, so embed and search it once
+            search_queries.append(f"{company_symbol} financial analysis annual report")
         
-        # Format results
-        formatted_results = []
-        for content, metadata, score in results:
-            formatted_results.append({
-                'content': content,
-                'metadata': metadata,
-                'relevance_score': score
-            })
+        all_results = self.embedding_manager.search_knowledge_base_batch(search_queries, top_k=5)
+        company_results = all_results.pop()[:3] if company_symbol else []
         
-        return formatted_results
+        return [
+            [
+                {'content': content, 'metadata': metadata, 'relevance_score': score}
+                for content, metadata, score in results + company_results
+            ]
+            for results in all_results
+        ]
     
     def _get_company_data(self, company_symbol: str) -> Optional[Dict[str, Any]]:
         """Retrieve company-specific financial data."""
@@ -215,77 +611,162 @@ class QueryEngine:
     def _generate_response(self, context: QueryContext) -> AnalysisResponse:
         """Generate LLM response based on context."""
         try:
-            # Build sources list
-            sources = [doc['metadata'].get('source', 'Unknown source') for doc in context.retrieved_documents]
+            prompt = self._build_response_prompt(context)
+            ai_response = self._call_llm(prompt)
+            return self._format_response(context, ai_response)
             
-            # Build prompt
-            prompt = f"""You are an expert investment analyst. Answer the following question based on the provided context.
+        except Exception as e:
+            logger.error(f"Failed to generate LLM response: {str(e)}")
+            return self._error_response(context)
+    
+    async def _agenerate_response(self, context: QueryContext) -> AnalysisResponse:
+        """Async variant of _generate_response."""
+        try:
+            prompt = self._build_response_prompt(context)
+            ai_response = await self._acall_llm(prompt)
+            return self._format_response(context, ai_response)
+            
+        except Exception as e:
+            logger.error(f"Failed to generate LLM response: {str(e)}")
+            return self._error_response(context)
+    
+    def _build_response_prompt(self, context: QueryContext) -> str:
+        """Build the question-answering prompt sent to the LLM."""
+        # Stable instructions lead and the question comes last, so repeated calls share a cacheable prefix
+        return f"""You are an expert investment analyst. Answer the question at the end based on the provided context.
             If you cannot answer from the context, say so.
 
-            Question: {context.query}
+            Provide a detailed, well-structured response that:
+            1. Directly answers the question
+            2. Cites specific information from the sources
+            3. Explains the reasoning behind your analysis
+            4. Highlights any important caveats or limitations
 
             Context:
-            {context.retrieved_documents}
+            {self._format_context_block(context.retrieved_documents)}
 
-            Sources: {', '.join(sources)}
+            Question: {context.query}
 
-            Provide a detailed, well-structured response that:
+            Response:"""
+    
+    def _format_context_block(self, documents: List[Dict[str, Any]]) -> str:
+        """Render retrieved documents as a compact, deduplicated, numbered context block."""
+        lines = []
+        seen = set()
+        for doc in documents:
+            if doc['content'] in seen:
+                continue
+            seen.add(doc['content'])
+            source = doc['metadata'].get('source', 'Unknown source')
+            lines.append(f"[{len(lines) + 1}] {source}: {doc['content'][:PROMPT_DOC_CHARS]}")
+            if len(lines) == PROMPT_DOC_LIMIT:
+                break
+        return "\n".join(lines)
+    
+    def _build_batch_prompt(self, contexts: List[QueryContext]) -> str:
+        """Build one prompt asking every question, answered as JSON keyed by question number."""
+        questions = []
+        for number, context in enumerate(contexts, start=1):
+            questions.append(f"""Question {number}: {context.query}
+
+            Context:
+            {self._format_context_block(context.retrieved_documents)}""")
+        
+        return f"""You are an expert investment analyst. Answer each of the numbered questions below based on the context provided with it.
+            If you cannot answer a question from its context, say so.
+
+            For each question provide a detailed, well-structured response that:
             1. Directly answers the question
             2. Cites specific information from the sources
             3. Explains the reasoning behind your analysis
             4. Highlights any important caveats or limitations
 
-            Response:"""
-            
-            # Call appropriate LLM API based on provider
-            if self.llm_provider == 'ollama':
-                ai_response = self._call_ollama(prompt)
-            elif self.llm_provider == 'openai':
-                ai_response = self._call_openai(prompt)
-            else:
-                raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
-            
-            # Format sources to include content
-            sources = []
-            for doc in context.retrieved_documents[:3]:
-                source = f"{doc['metadata'].get('source', 'Knowledge Base')}: {doc['content'][:150]}..."
-                sources.append(source)
-            
-            return AnalysisResponse(
-                query=context.query,
-                answer=ai_response,
-                reasoning="Analysis based on retrieved knowledge and investment persona",
-                confidence_score=0.85,  # Could be calculated based on retrieval scores
-                sources=sources,
-                recommendations=self._extract_recommendations(ai_response),
-                timestamp=datetime.now()
-            )
-            
-        except Exception as e:
-            logger.error(f"Failed to generate LLM response: {str(e)}")
-            # Fallback response
-            return AnalysisResponse(
-                query=context.query,
-                answer="I apologize, but I encountered an error generating the analysis. Please check your API configuration and try again.",
-                reasoning="Error in response generation",
-                confidence_score=0.0,
-                sources=[],
-                recommendations=[],
-                timestamp=datetime.now()
-            )
+            Return a JSON object keyed by question number ("1", "2", ...) whose values are the responses.
+
+            {chr(10).join(questions)}"""
+    
+    def _format_response(self, context: QueryContext, ai_response: str) -> AnalysisResponse:
+        """Wrap an LLM answer into an AnalysisResponse."""
+        # Format sources to include content
+        sources = []
+        for doc in context.retrieved_documents[:3]:
+            source = f"{doc['metadata'].get('source', 'Knowledge Base')}: {doc['content'][:150]}..."
+            sources.append(source)
+        
+        return AnalysisResponse(
+            query=context.query,
+            answer=ai_response,
+            reasoning="Analysis based on retrieved knowledge and investment persona",
+            confidence_score=0.85,  # Could be calculated based on retrieval scores
+            sources=sources,
+            recommendations=self._extract_recommendations(ai_response),
+            timestamp=datetime.now()
+        )
     
-    def _call_ollama(self, prompt: str) -> str:
+    def _error_response(self, context: QueryContext) -> AnalysisResponse:
+        """Fallback response when the LLM call fails."""
+        return AnalysisResponse(
+            query=context.query,
+            answer="I apologize, but I encountered an error generating the analysis. Please check your API configuration and try again.",
+            reasoning="Error in response generation",
+            confidence_score=0.0,
+            sources=[],
+            recommendations=[],
+            timestamp=datetime.now()
+        )
+    
+    def _call_llm(self, prompt: str, json_mode: bool = False) -> str:
+        """Call the configured LLM provider, serving repeated prompts from the cache."""
+        cache_key = self._cache_key(prompt, json_mode=json_mode)
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Call appropriate LLM API based on provider
+        if self.llm_provider == 'ollama':
+            ai_response = self._call_ollama(prompt, json_mode=json_mode)
+        elif self.llm_provider in ('openai', 'llamacpp'):
+            ai_response = self._call_openai(prompt, json_mode=json_mode)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
+        
+        self.llm_cache.set(cache_key, ai_response)
+        return ai_response
+    
+    async def _acall_llm(self, prompt: str) -> str:
+        """Async variant of _call_llm."""
+        cache_key = self._cache_key(prompt)
+        cached = self.llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if self.llm_provider == 'ollama':
+            ai_response = await self._acall_ollama(prompt)
+        elif self.llm_provider in ('openai', 'llamacpp'):
+            ai_response = await self._acall_openai(prompt)
+        else:
+            raise ValueError(f"Unsupported LLM provider: {self.llm_provider}")
+        
+        self.llm_cache.set(cache_key, ai_response)
+        return ai_response
+    
+    def _cache_key(self, prompt: str, json_mode: bool = False) -> str:
+        """Cache key for a prompt; changing the model or generation settings invalidates earlier answers."""
+        return LLMCache.make_key(
+            self.model, prompt,
+            provider=self.llm_provider,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            json_mode=json_mode
+        )
+    
+    def _call_ollama(self, prompt: str, json_mode: bool = False) -> str:
         """Call Ollama API for LLM response."""
         try:
             response = ollama.chat(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are NiveshakAI, an expert investment advisor with deep knowledge of fundamental analysis. Provide detailed, actionable investment advice based on the user's persona and available data."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._build_messages(prompt),
+                format='json' if json_mode else None,
                 options={
                     "temperature": self.temperature,
                     "num_predict": self.max_tokens
@@ -296,83 +777,149 @@ class QueryEngine:
             logger.error(f"Ollama API call failed: {str(e)}")
             raise
     
-    def _call_openai(self, prompt: str) -> str:
+    def _call_openai(self, prompt: str, json_mode: bool = False) -> str:
         """Call OpenAI API for LLM response."""
         try:
+            extra_args = {"response_format": {"type": "json_object"}} if json_mode else {}
             response = self.openai_client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are NiveshakAI, an expert investment advisor with deep knowledge of fundamental analysis. Provide detailed, actionable investment advice based on the user's persona and available data."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._build_messages(prompt),
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                user=self.cache_user,
+                **extra_args
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"OpenAI API call failed: {str(e)}")
+            raise
+    
+    def _call_ollama_stream(self, prompt: str) -> Iterator[str]:
+        """Stream an Ollama response as text deltas."""
+        try:
+            for part in ollama.chat(
+                model=self.model,
+                messages=self._build_messages(prompt),
+                stream=True,
+                options={
+                    "temperature": self.temperature,
+                    "num_predict": self.max_tokens
+                }
+            ):
+                if part['message']['content']:
+                    yield part['message']['content']
+        except Exception as e:
+            logger.error(f"Ollama API call failed: {str(e)}")
+            raise
+    
+    def _call_openai_stream(self, prompt: str) -> Iterator[str]:
+        """Stream an OpenAI response as text deltas."""
+        try:
+            stream = self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt),
                 temperature=self.temperature,
-                max_tokens=self.max_tokens
+                max_tokens=self.max_tokens,
+                user=self.cache_user,
+                stream=True
             )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"OpenAI API call failed: {str(e)}")
+            raise
+    
+    async def _acall_ollama(self, prompt: str) -> str:
+        """Call Ollama API asynchronously for LLM response."""
+        try:
+            async with ollama.AsyncClient() as client:
+                response = await client.chat(
+                    model=self.model,
+                    messages=self._build_messages(prompt),
+                    options={
+                        "temperature": self.temperature,
+                        "num_predict": self.max_tokens
+                    }
+                )
+            return response['message']['content']
+        except Exception as e:
+            logger.error(f"Ollama API call failed: {str(e)}")
+            raise
+    
+    @asynccontextmanager
+    async def async_session(self) -> AsyncIterator[Optional[AsyncOpenAI]]:
+        """Share one pooled async LLM client across the calls made inside the block, closing it on exit."""
+        # httpx async connections are bound to the loop that opened them, so the client lives only as long
+        # as the block; nested blocks reuse the outer client
+        current = _async_session_client.get()
+        if current is not None and current[0] is self:
+            yield current[1]
+            return
+        if self.llm_provider not in ('openai', 'llamacpp'):
+            yield None
+            return
+        
+        client = AsyncOpenAI(
+            api_key=self.openai_client.api_key,
+            base_url=self.openai_client.base_url,
+            http_client=httpx.AsyncClient(**_http_client_options())
+        )
+        token = _async_session_client.set((self, client))
+        try:
+            yield client
+        finally:
+            _async_session_client.reset(token)
+            await client.close()
+    
+    async def _acall_openai(self, prompt: str) -> str:
+        """Call OpenAI API asynchronously for LLM response."""
+        try:
+            async with self.async_session() as client:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(prompt),
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    user=self.cache_user
+                )
             return response.choices[0].message.content
         except Exception as e:
             logger.error(f"OpenAI API call failed: {str(e)}")
             raise
     
+    @cached_property
+    def cache_user(self) -> str:
+        """Stable OpenAI user id so requests sharing the system block are routed to the same cache."""
+        return "niveshak-" + hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()[:16]
+    
+    def _build_messages(self, prompt: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a prompt."""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+    
     def _extract_recommendations(self, ai_response: str) -> List[str]:
         """Extract recommendations from AI response."""
-        # Simple extraction - look for recommendation keywords
+        # Simple extraction - bullets following a line with a recommendation keyword
         recommendations = []
-        lines = ai_response.split('\n')
         
         in_recommendations = False
-        for line in lines:
+        for line in ai_response.split('\n'):
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ['recommendation', 'suggest', 'consider']):
+            if _RECOMMENDATION_KEYWORD_RE.search(line):
                 in_recommendations = True
-            elif in_recommendations and line.startswith(('•', '-', '1.', '2.', '3.')):
-                recommendations.append(line.lstrip('•-123456789. '))
-            elif in_recommendations and line == '':
+            elif not in_recommendations or line == '':
                 continue
-            elif in_recommendations and not line.startswith(('•', '-', '1.', '2.', '3.')):
+            elif bullet := _BULLET_RE.match(line):
+                recommendations.append(bullet.group(1))
+                if len(recommendations) == 5:  # Return max 5 recommendations
+                    break
+            else:
                 in_recommendations = False
         
-        return recommendations[:5]  # Return max 5 recommendations
-    
-    def _build_prompt(self, context: QueryContext) -> str:
-        """Build comprehensive prompt for LLM."""
-        persona_prompt = self.persona_manager.get_persona_prompt()
-        
-        # Add retrieved context
-        context_text = "\n\nRELEVANT KNOWLEDGE:\n"
-        for i, doc in enumerate(context.retrieved_documents[:3]):  # Top 3 most relevant
-            context_text += f"{i+1}. {doc['content'][:500]}...\n"
-        
-        # Add company data if available
-        company_context = ""
-        if context.company_data:
-            company_context = f"\n\nCOMPANY DATA:\n{context.company_data}"
-        
-        prompt = f"""
-{persona_prompt}
-
-{context_text}
-{company_context}
-
-USER QUESTION: {context.query}
-
-Please provide a comprehensive investment analysis that:
-1. Directly answers the user's question
-2. Incorporates relevant information from the knowledge base
-3. Aligns with the investor's personal philosophy and risk tolerance
-4. Provides clear reasoning for any recommendations
-5. Mentions specific sources when referencing data
-
-Format your response with clear sections for:
-- Analysis
-- Reasoning
-- Recommendations (if applicable)
-- Risk Considerations
-"""
-        
-        return prompt.strip()
+        return recommendations
 
 
 class AnalysisReportGenerator:
@@ -384,21 +931,51 @@ class AnalysisReportGenerator:
     
     def generate_company_analysis_report(self, company_symbol: str) -> Dict[str, Any]:
         """Generate comprehensive company analysis report."""
-        queries = [
+        queries = self._report_queries(company_symbol)
+        
+        # Questions share the persona and company context, so ask them in one call;
+        # very long contexts can lower the batch size to fall back to concurrent calls
+        if len(queries) <= self._report_batch_size():
+            responses = self.query_engine.process_query_batch(queries, company_symbol)
+        else:
+            responses = _run_coroutine(self._process_queries(queries, company_symbol))
+        
+        return self._build_report(company_symbol, queries, responses)
+    
+    async def agenerate_company_analysis_report(self, company_symbol: str) -> Dict[str, Any]:
+        """Async variant of generate_company_analysis_report for callers already inside an event loop."""
+        queries = self._report_queries(company_symbol)
+        
+        if len(queries) <= self._report_batch_size():
+            responses = await asyncio.to_thread(self.query_engine.process_query_batch, queries, company_symbol)
+        else:
+            responses = await self._process_queries(queries, company_symbol)
+        
+        return self._build_report(company_symbol, queries, responses)
+    
+    def _report_queries(self, company_symbol: str) -> List[str]:
+        """Questions answered by a company analysis report, in section order."""
+        return [
             f"What is the financial health of {company_symbol}?",
             f"What are the key risks for investing in {company_symbol}?",
             f"Is {company_symbol} undervalued or overvalued?",
             f"What is the competitive position of {company_symbol}?"
         ]
-        
+    
+    def _report_batch_size(self) -> int:
+        """Most report questions asked in a single LLM call."""
+        return self.query_engine.config.get('processing', {}).get('report_batch_size', 4)
+    
+    def _build_report(self, company_symbol: str, queries: List[str],
+                      responses: List[AnalysisResponse]) -> Dict[str, Any]:
+        """Assemble the report sections from the answers to the report questions."""
         report = {
             'company_symbol': company_symbol,
             'generation_date': datetime.now().isoformat(),
             'sections': {}
         }
         
-        for query in queries:
-            response = self.query_engine.process_query(query, company_symbol)
+        for query, response in zip(queries, responses):
             section_name = query.split('?')[0].replace(f'{company_symbol}', '').strip()
             report['sections'][section_name] = {
                 'analysis': response.answer,
@@ -409,22 +986,70 @@ class AnalysisReportGenerator:
         
         return report
     
+    async def _process_queries(self, queries: List[str], company_symbol: str) -> List[AnalysisResponse]:
+        """Run all report queries concurrently over one LLM client, preserving query order."""
+        async with self.query_engine.async_session():
+            return await asyncio.gather(
+                *(self.query_engine.aprocess_query(query, company_symbol) for query in queries)
+            )
+    
     def save_report(self, report: Dict[str, Any], output_dir: str = "data/reports") -> str:
         """Save analysis report to file."""
-        import os
-        import json
-        
         os.makedirs(output_dir, exist_ok=True)
         
         filename = f"{report['company_symbol']}_analysis_{datetime.now().strftime('%Y%m%d')}.json"
         filepath = os.path.join(output_dir, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(report, f, indent=2)
+        if ORJSON_AVAILABLE:
+            data = orjson.dumps(report, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        else:
+            data = json.dumps(report, indent=2).encode()
         
+        # The write happens on a background thread; call flush_report_writes() to wait for it
+        _enqueue_report_write(filepath, data)
         return filepath
 
 
+_REPORT_WRITE_QUEUE: "queue.Queue[tuple]" = queue.Queue()
+_report_writer_lock = threading.Lock()
+_report_writer: Optional[threading.Thread] = None
+
+
+def _write_reports():
+    """Drain queued report writes, replacing each file atomically."""
+    while True:
+        filepath, data = _REPORT_WRITE_QUEUE.get()
+        try:
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, filepath)
+        except OSError as e:
+            logger.error(f"Failed to write report {filepath}: {str(e)}")
+        finally:
+            _REPORT_WRITE_QUEUE.task_done()
+
+
+def _enqueue_report_write(filepath: str, data: bytes):
+    """Hand serialized report bytes to the writer thread, starting it on first use."""
+    global _report_writer
+    with _report_writer_lock:
+        if _report_writer is None:
+            _report_writer = threading.Thread(target=_write_reports, name="report-writer", daemon=True)
+            _report_writer.start()
+    _REPORT_WRITE_QUEUE.put((filepath, data))
+
+
+def flush_report_writes():
+    """Block until every queued report has been written."""
+    _REPORT_WRITE_QUEUE.join()
+
+
+# The writer is a daemon thread, so make sure queued reports land before the interpreter exits
+atexit.register(flush_report_writes)
+
+
+@lru_cache(maxsize=4)
 def create_query_engine(config_path: str = "config/settings.yaml") -> QueryEngine:
-    """Create and return a query engine instance."""
+    """Create and return the query engine for a settings file, reused across calls."""
     return QueryEngine(config_path)
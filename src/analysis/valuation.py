@@ -8,12 +8,32 @@ This module provides comprehensive valuation methods including:
 - Investment Recommendations
 """
 
-from typing import Dict, Any, List
+from functools import lru_cache
+from itertools import accumulate
+from operator import mul
+from typing import Dict, Any, List, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _dcf_core(fcf: float, growth_rates: Tuple[float, ...], discount_rate: float,
+              terminal_growth_rate: float) -> Tuple[Tuple[float, ...], Tuple[float, ...], float, float, float]:
+    """
+    Cash-flow part of a DCF, cached on its inputs so repeated valuations of a company are lookups
+    
+    Returns:
+        Projected FCFs, their present values, terminal value, PV of terminal value and enterprise value
+    """
+    projected_fcfs = tuple(accumulate((1 + growth_rate for growth_rate in growth_rates), mul, initial=fcf))[1:]
+    pv_fcfs = tuple(fcf / ((1 + discount_rate) ** year) for year, fcf in enumerate(projected_fcfs, 1))
+    terminal_fcf = projected_fcfs[-1] * (1 + terminal_growth_rate)
+    terminal_value = terminal_fcf / (discount_rate - terminal_growth_rate)
+    pv_terminal = terminal_value / ((1 + discount_rate) ** len(projected_fcfs))
+    return projected_fcfs, pv_fcfs, terminal_value, pv_terminal, sum(pv_fcfs) + pv_terminal
+
+
 class DCFAnalyzer:
     """
     Discounted Cash Flow (DCF) Analyzer
@@ -58,19 +78,9 @@ class DCFAnalyzer:
             # Determine growth rates based on company maturity and sector
             growth_rates = self._determine_growth_rates(financial_data)
             
-            # Project future free cash flows
-            projected_fcfs = self._project_free_cash_flows(fcf, growth_rates)
-            
-            # Calculate present value of projected FCFs
-            pv_fcfs = self._calculate_present_values(projected_fcfs)
-            
-            # Calculate terminal value
-            terminal_fcf = projected_fcfs[-1] * (1 + self.terminal_growth_rate)
-            terminal_value = terminal_fcf / (self.discount_rate - self.terminal_growth_rate)
-            pv_terminal = terminal_value / ((1 + self.discount_rate) ** len(projected_fcfs))
-            
-            # Calculate enterprise value and equity value
-            enterprise_value = sum(pv_fcfs) + pv_terminal
+            # Project and discount future free cash flows, add terminal value, for enterprise value
+            projected_fcfs, pv_fcfs, terminal_value, pv_terminal, enterprise_value = _dcf_core(
+                fcf, tuple(growth_rates), self.discount_rate, self.terminal_growth_rate)
             
             # Adjust for net cash/debt
             net_debt = financial_data.get('total_debt', 0) - financial_data.get('cash_and_equivalents', 0)
@@ -89,8 +99,8 @@ class DCFAnalyzer:
             return {
                 'initial_fcf': fcf,
                 'growth_rates': growth_rates,
-                'projected_fcfs': projected_fcfs,
-                'present_value_fcfs': pv_fcfs,
+                'projected_fcfs': list(projected_fcfs),
+                'present_value_fcfs': list(pv_fcfs),
                 'terminal_value': terminal_value,
                 'pv_terminal_value': pv_terminal,
                 'enterprise_value': enterprise_value,
@@ -163,14 +173,8 @@ class DCFAnalyzer:
         Returns:
             List of projected FCFs
         """
-        projected_fcfs = []
-        current_fcf = initial_fcf
-        
-        for growth_rate in growth_rates:
-            current_fcf = current_fcf * (1 + growth_rate)
-            projected_fcfs.append(current_fcf)
-        
-        return projected_fcfs
+        growth_factors = [1 + growth_rate for growth_rate in growth_rates]
+        return list(accumulate(growth_factors, mul, initial=initial_fcf))[1:]
     
     def _calculate_present_values(self, future_cash_flows: List[float]) -> List[float]:
         """
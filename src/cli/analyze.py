@@ -195,13 +195,24 @@ def _generate_company_report(company: str, query_engine: QueryEngine, output: Op
 @click.option('--verbose', 
               is_flag=True, 
               help='Verbose output')
-def ask(query: str, config: str, verbose: bool):
+@click.option('--stream',
+              is_flag=True,
+              help='Print the answer as it is generated')
+def ask(query: str, config: str, verbose: bool, stream: bool):
     """Ask a general investment question to the AI assistant."""
     
     try:
         query_engine = QueryEngine(config)
         
         click.echo(f"💭 Processing: {query}")
+        if stream:
+            click.echo("\n📝 Analysis:")
+            click.echo("-" * 40)
+            for chunk in query_engine.process_query_stream(query):
+                click.echo(chunk, nl=False)
+            click.echo()
+            return
+        
         response = query_engine.process_query(query)
         
         _display_analysis_response(response, verbose)
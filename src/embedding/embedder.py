@@ -9,6 +9,11 @@ This module handles:
 """
 
 import os
+import re
+import json
+import hashlib
+import sqlite3
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 import numpy as np
@@ -16,7 +21,11 @@ import yaml
 from dataclasses import dataclass
 import uuid
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct, Filter, FieldCondition, Range
+from qdrant_client.models import (
+    Distance, VectorParams, PointStruct, Filter, FieldCondition, Range, QueryRequest,
+    ScalarQuantization, ScalarQuantizationConfig, ScalarType, SearchParams, QuantizationSearchParams,
+    HnswConfigDiff
+)
 
 from ..utils import logger
 
@@ -84,6 +93,9 @@ class OpenAIEmbedder(EmbeddingProvider):
 class OllamaEmbedder(EmbeddingProvider):
     """Ollama embedding provider for local embeddings."""
     
+    # Texts sent per /api/embed request, so a whole book is not embedded in one call
+    BATCH_SIZE = 64
+    
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "nomic-embed-text"):
         """Initialize Ollama embedder."""
         self.base_url = base_url
@@ -120,16 +132,19 @@ class OllamaEmbedder(EmbeddingProvider):
             raise
     
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a batch of texts."""
-        embeddings = []
-        for text in texts:
-            try:
-                embedding = self.embed_text(text)
-                embeddings.append(embedding)
-            except Exception as e:
-                logger.error(f"Failed to generate embedding for text batch: {str(e)}")
-                raise
-        return embeddings
+        """Generate embeddings for a batch of texts, BATCH_SIZE texts per request."""
+        try:
+            embeddings = []
+            for start in range(0, len(texts), self.BATCH_SIZE):
+                response = self.client.embed(
+                    model=self.model,
+                    input=texts[start:start + self.BATCH_SIZE]
+                )
+                embeddings.extend(list(embedding) for embedding in response.embeddings)
+            return embeddings
+        except Exception as e:
+            logger.error(f"Failed to generate embedding for text batch: {str(e)}")
+            raise
 
 
 class VectorStore(ABC):
@@ -145,6 +160,10 @@ class VectorStore(ABC):
         """Search for similar documents."""
         pass
     
+    def search_similar_batch(self, query_embeddings: List[List[float]], top_k: int = 5) -> List[List[Tuple[Document, float]]]:
+        """Search for similar documents for several query embeddings."""
+        return [self.search_similar(query_embedding, top_k) for query_embedding in query_embeddings]
+    
     @abstractmethod
     def delete_document(self, doc_id: str) -> bool:
         """Delete a document by ID."""
@@ -159,12 +178,21 @@ class VectorStore(ABC):
 class QdrantVectorStore(VectorStore):
     """Qdrant vector database implementation."""
     
-    def __init__(self, host: str, port: int, collection_name: str, vector_size: int):
+    def __init__(self, host: str, port: int, collection_name: str, vector_size: int,
+                 quantization: Optional[str] = None, hnsw: Optional[Dict[str, int]] = None):
         """Initialize Qdrant vector store."""
         self.host = host
         self.port = port
         self.collection_name = collection_name
         self.vector_size = vector_size
+        self.hnsw = hnsw or {}
+        
+        if quantization not in (None, 'int8'):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.quantization = quantization
+        
+        # HNSW is used unless NIVESHAK_USE_VEC_INDEX disables it, e.g. to compare against exact search
+        self.use_index = os.getenv('NIVESHAK_USE_VEC_INDEX', '1').lower() not in ('0', 'false', 'no')
         
         # Try to connect to remote Qdrant first, fallback to in-memory
         try:
@@ -172,11 +200,16 @@ class QdrantVectorStore(VectorStore):
             # Test connection
             self.client.get_collections()
             logger.info(f"Connected to Qdrant at {host}:{port}")
+            is_local = False
         except Exception as e:
             logger.warning(f"Could not connect to Qdrant server at {host}:{port}: {e}")
             logger.info("Falling back to in-memory Qdrant instance")
             # Use in-memory Qdrant instance
             self.client = QdrantClient(":memory:")
+            is_local = True
+        
+        # The in-memory instance always searches exactly and rejects search params
+        self.search_params = None if is_local else self._search_params()
         
         # Create collection if it doesn't exist
         self._ensure_collection_exists()
@@ -195,16 +228,49 @@ class QdrantVectorStore(VectorStore):
                     vectors_config=VectorParams(
                         size=self.vector_size,
                         distance=Distance.COSINE
-                    )
+                    ),
+                    hnsw_config=HnswConfigDiff(
+                        m=self.hnsw.get('m'),
+                        ef_construct=self.hnsw.get('ef_construct')
+                    ),
+                    quantization_config=self._quantization_config()
                 )
                 logger.info(f"Created Qdrant collection: {self.collection_name}")
             else:
                 logger.info(f"Using existing Qdrant collection: {self.collection_name}")
+                if self.quantization:
+                    collection_info = self.client.get_collection(self.collection_name)
+                    if collection_info.config.quantization_config is None:
+                        # Qdrant builds the quantized copy of existing vectors in the background
+                        self.client.update_collection(
+                            collection_name=self.collection_name,
+                            quantization_config=self._quantization_config()
+                        )
+                        logger.info(f"Enabled {self.quantization} quantization on {self.collection_name}")
                 
         except Exception as e:
             logger.error(f"Failed to ensure collection exists: {str(e)}")
             raise
         
+    def _search_params(self) -> Optional[SearchParams]:
+        """Build search params for the HNSW index and quantized vectors."""
+        if self.use_index and not self.quantization and 'ef' not in self.hnsw:
+            return None
+        return SearchParams(
+            hnsw_ef=self.hnsw.get('ef'),
+            exact=not self.use_index,
+            # Search the int8 vectors, then rescore the top candidates with the originals
+            quantization=QuantizationSearchParams(rescore=True) if self.quantization else None
+        )
+    
+    def _quantization_config(self) -> Optional[ScalarQuantization]:
+        """Build the scalar quantization config; int8 stores vectors in a quarter of the memory."""
+        if self.quantization != 'int8':
+            return None
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    
     def add_documents(self, documents: List[Document]) -> bool:
         """Add documents to Qdrant collection."""
         try:
@@ -237,24 +303,16 @@ class QdrantVectorStore(VectorStore):
         """Search for similar documents in Qdrant."""
         try:
             # Search for similar vectors
-            search_result = self.client.search(
+            search_result = self.client.query_points(
                 collection_name=self.collection_name,
-                query_vector=query_embedding,
+                query=query_embedding,
                 limit=top_k,
+                search_params=self.search_params,
                 with_payload=True,
                 with_vectors=False  # We don't need vectors in response
             )
             
-            # Convert results to Document objects
-            results = []
-            for scored_point in search_result:
-                doc = Document(
-                    id=str(scored_point.id),
-                    content=scored_point.payload["content"],
-                    metadata=scored_point.payload["metadata"],
-                    embedding=None  # We don't need the embedding for search results
-                )
-                results.append((doc, scored_point.score))
+            results = self._to_documents(search_result.points)
             
             logger.info(f"Found {len(results)} similar documents in Qdrant")
             return results
@@ -263,6 +321,37 @@ class QdrantVectorStore(VectorStore):
             logger.error(f"Failed to search Qdrant: {str(e)}")
             return []
     
+    def search_similar_batch(self, query_embeddings: List[List[float]], top_k: int = 5) -> List[List[Tuple[Document, float]]]:
+        """Search for several query embeddings in one Qdrant request."""
+        try:
+            # Similarity scoring stays inside Qdrant's native kernels; one round trip for all queries
+            batch_result = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    QueryRequest(query=query_embedding, limit=top_k, params=self.search_params,
+                                 with_payload=True, with_vector=False)
+                    for query_embedding in query_embeddings
+                ]
+            )
+            
+            return [self._to_documents(response.points) for response in batch_result]
+            
+        except Exception as e:
+            logger.error(f"Failed to batch search Qdrant: {str(e)}")
+            return [[] for _ in query_embeddings]
+    
+    def _to_documents(self, scored_points) -> List[Tuple[Document, float]]:
+        """Convert Qdrant scored points to (Document, score) pairs."""
+        return [
+            (Document(
+                id=str(scored_point.id),
+                content=scored_point.payload["content"],
+                metadata=scored_point.payload["metadata"],
+                embedding=None  # We don't need the embedding for search results
+            ), scored_point.score)
+            for scored_point in scored_points
+        ]
+    
     def delete_document(self, doc_id: str) -> bool:
         """Delete a document from Qdrant."""
         try:
@@ -301,6 +390,80 @@ class QdrantVectorStore(VectorStore):
             return None
 
 
+class KeywordIndex:
+    """SQLite FTS5 index over chunk content for exact-term (e.g. ticker) lookups."""
+    
+    def __init__(self, db_path: str = ":memory:"):
+        """Initialize keyword index, creating the FTS5 table if needed."""
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(content, metadata UNINDEXED)")
+        self.conn.commit()
+    
+    @staticmethod
+    def _chunk_id(text: str) -> int:
+        """Stable 64-bit rowid derived from chunk content."""
+        return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'big', signed=True)
+    
+    def add_documents(self, texts: List[str], metadata_list: List[Dict[str, Any]]):
+        """Index chunk content alongside its metadata; re-ingesting a chunk replaces its earlier row."""
+        # FTS5 has no unique constraints, so the content hash is used as the rowid instead
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO chunks (rowid, content, metadata) VALUES (?, ?, ?)",
+                [(self._chunk_id(text), text, json.dumps(metadata)) for text, metadata in zip(texts, metadata_list)]
+            )
+            self.conn.commit()
+    
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Return the best BM25 matches for any of the query's terms."""
+        # Quote each term so punctuation in the query cannot break FTS5 syntax
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT content, metadata, bm25(chunks) FROM chunks WHERE chunks MATCH ? "
+                "ORDER BY bm25(chunks) LIMIT ?",
+                (match, top_k)
+            ).fetchall()
+        # bm25() is lower-is-better; negate so higher scores mean more relevant
+        return [(content, json.loads(metadata), -rank) for content, metadata, rank in rows]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Tuple[str, Dict[str, Any], float]]],
+                           top_k: int, k: int = 60) -> List[Tuple[str, Dict[str, Any], float]]:
+    """
+    Merge ranked result lists, scoring each document by sum(1 / (k + rank)).
+    
+    Only a document's best rank in each list counts, so duplicates within a list are not rewarded.
+    
+    Args:
+        result_lists: Ranked (content, metadata, score) lists from different retrievers
+        top_k: Number of fused results to return
+        k: Rank smoothing constant
+        
+    Returns:
+        Top fused (content, metadata, rrf_score) tuples
+    """
+    fused: Dict[str, List[Any]] = {}
+    for results in result_lists:
+        seen = set()
+        for rank, (content, metadata, _) in enumerate(results, start=1):
+            if content in seen:
+                continue
+            seen.add(content)
+            entry = fused.setdefault(content, [metadata, 0.0])
+            entry[1] += 1.0 / (k + rank)
+    
+    ranked = sorted(fused.items(), key=lambda item: item[1][1], reverse=True)
+    return [(content, metadata, score) for content, (metadata, score) in ranked[:top_k]]
+
+
 class EmbeddingManager:
     """Manages embedding generation and vector store operations."""
     
@@ -309,7 +472,21 @@ class EmbeddingManager:
         self.config = config
         self.embedder = self._create_embedder()
         self.vector_store = self._create_vector_store()
+        self.keyword_index = self._create_keyword_index()
+        # Bumped whenever documents are added, so callers can tell cached search results are stale
+        self.documents_version = 0
         
+    def _create_keyword_index(self) -> Optional[KeywordIndex]:
+        """Create the keyword index used for hybrid search, if enabled."""
+        if not self.config['vector_db'].get('hybrid_search', False):
+            return None
+        embeddings_dir = self.config.get('storage', {}).get('embeddings_dir', 'data/embeddings')
+        try:
+            return KeywordIndex(os.path.join(embeddings_dir, 'keyword_index.sqlite'))
+        except sqlite3.Error as e:
+            logger.warning(f"Keyword index unavailable, using vector search only: {str(e)}")
+            return None
+    
     def _create_embedder(self) -> EmbeddingProvider:
         """Create embedding provider based on configuration."""
         provider = self.config['embedding']['provider']
@@ -337,7 +514,9 @@ class EmbeddingManager:
                 host=config['host'],
                 port=config['port'],
                 collection_name=config['collection_name'],
-                vector_size=config['vector_size']
+                vector_size=config['vector_size'],
+                quantization=config.get('quantization'),
+                hnsw=config.get('hnsw')
             )
         else:
             raise ValueError(f"Unsupported vector store provider: {provider}")
@@ -360,7 +539,13 @@ class EmbeddingManager:
                 documents.append(doc)
             
             # Add to vector store
-            return self.vector_store.add_documents(documents)
+            if not self.vector_store.add_documents(documents):
+                return False
+            
+            if self.keyword_index:
+                self.keyword_index.add_documents(texts, metadata_list)
+            self.documents_version += 1
+            return True
             
         except Exception as e:
             logger.error(f"Failed to add text documents: {str(e)}")
@@ -381,20 +566,59 @@ class EmbeddingManager:
             # Generate query embedding
             query_embedding = self.embedder.embed_text(query)
             
-            # Search vector store
-            results = self.vector_store.search_similar(query_embedding, top_k)
+            # Search vector store, over-fetching when results will be fused with keyword hits
+            results = self.vector_store.search_similar(query_embedding, self._candidate_count(top_k))
             
             # Format results
             formatted_results = []
             for doc, score in results:
                 formatted_results.append((doc.content, doc.metadata, score))
             
-            return formatted_results
+            return self._fuse_with_keywords(query, formatted_results, top_k)
             
         except Exception as e:
             logger.error(f"Failed to search knowledge base: {str(e)}")
             return []
 
+    
+    def search_knowledge_base_batch(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[str, Dict[str, Any], float]]]:
+        """
+        Search the knowledge base for several queries with a single embedding request.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of top results to return per query
+            
+        Returns:
+            One list of (content, metadata, score) tuples per query
+        """
+        try:
+            query_embeddings = self.embedder.embed_batch(queries)
+            
+            batch_results = self.vector_store.search_similar_batch(query_embeddings, self._candidate_count(top_k))
+            
+            return [
+                self._fuse_with_keywords(query, [(doc.content, doc.metadata, score) for doc, score in results], top_k)
+                for query, results in zip(queries, batch_results)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to search knowledge base: {str(e)}")
+            return [[] for _ in queries]
+
+    
+    def _candidate_count(self, top_k: int) -> int:
+        """Number of vector hits to fetch before fusion."""
+        return max(top_k, 10) if self.keyword_index else top_k
+    
+    def _fuse_with_keywords(self, query: str, vector_results: List[Tuple[str, Dict[str, Any], float]],
+                            top_k: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Combine vector hits with FTS5 keyword hits using reciprocal rank fusion."""
+        if not self.keyword_index:
+            return vector_results[:top_k]
+        keyword_results = self.keyword_index.search(query, top_k=10)
+        return reciprocal_rank_fusion([vector_results, keyword_results], top_k)
+
 
 def create_embedding_manager(config_path: str = "config/settings.yaml") -> EmbeddingManager:
     """
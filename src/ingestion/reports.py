@@ -9,7 +9,6 @@ This module handles:
 """
 
 import json
-import re
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import yaml
@@ -18,7 +17,14 @@ from datetime import datetime
 import pdfplumber
 import pandas as pd
 
-from ..utils import PDFProcessor, FinancialCalculator, logger
+# PyMuPDF extracts page text much faster than pdfplumber; pdfplumber is still used for tables
+try:
+    import pymupdf
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+from ..utils import PDFProcessor, FinancialCalculator, build_section_matcher, logger
 
 
 @dataclass
@@ -258,6 +264,16 @@ def get_company_reports(company_symbol: str, reports_dir: str = "data/reports")
     return reports
 
 
+# Common annual report section headers (add more as needed), in priority order
+_SECTION_PATTERNS = (
+    r"Management Discussion and Analysis", r"Board's Report", r"Directors' Report",
+    r"Corporate Governance Report", r"Standalone Financial Statements", r"Consolidated Financial Statements",
+    r"Balance Sheet", r"Statement of Profit and Loss", r"Cash Flow Statement", r"Notes to Accounts",
+    r"Auditor's Report", r"Business Overview", r"Company Overview", r"Financial Highlights"
+)
+_SECTION_RE, _find_section_header = build_section_matcher(_SECTION_PATTERNS)
+
+
 class ReportExtractor:
     @staticmethod
     def extract_text_sections(pdf_path):
@@ -265,26 +281,17 @@ class ReportExtractor:
         Extracts text from the PDF and splits it into meaningful sections using common annual report headers.
         Returns a dict mapping section names to text.
         """
-        import re
         sections = {}
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = ""
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += page_text + "\n"
+        if PYMUPDF_AVAILABLE:
+            with pymupdf.open(pdf_path) as doc:
+                page_texts = [page.get_text("text") for page in doc]
+        else:
+            with pdfplumber.open(pdf_path) as pdf:
+                page_texts = [page.extract_text() for page in pdf.pages]
+        full_text = "".join(f"{page_text}\n" for page_text in page_texts if page_text)
 
-        # Define common section headers (add more as needed)
-        section_patterns = [
-            r"Management Discussion and Analysis", r"Board's Report", r"Directors' Report",
-            r"Corporate Governance Report", r"Standalone Financial Statements", r"Consolidated Financial Statements",
-            r"Balance Sheet", r"Statement of Profit and Loss", r"Cash Flow Statement", r"Notes to Accounts",
-            r"Auditor's Report", r"Business Overview", r"Company Overview", r"Financial Highlights"
-        ]
-        # Build regex pattern for splitting
-        pattern = r"(" + r"|".join(section_patterns) + r")"
         # Find all section headers and their positions
-        matches = list(re.finditer(pattern, full_text, re.IGNORECASE))
+        matches = list(_SECTION_RE.finditer(full_text))
         if not matches:
             sections['full_text'] = full_text
             return sections
@@ -306,25 +313,15 @@ class ReportExtractor:
         Extract tables from the PDF, handling multi-line headers and associating tables with nearby section headers if possible.
         Returns a list of dicts: { 'section': section_name, 'table': DataFrame }
         """
-        import re
         tables = []
         with pdfplumber.open(pdf_path) as pdf:
             last_section = None
             for page in pdf.pages:
                 # Try to find section header on this page
                 page_text = page.extract_text() or ""
-                section_header = None
-                section_patterns = [
-                    r"Management Discussion and Analysis", r"Board's Report", r"Directors' Report",
-                    r"Corporate Governance Report", r"Standalone Financial Statements", r"Consolidated Financial Statements",
-                    r"Balance Sheet", r"Statement of Profit and Loss", r"Cash Flow Statement", r"Notes to Accounts",
-                    r"Auditor's Report", r"Business Overview", r"Company Overview", r"Financial Highlights"
-                ]
-                for pat in section_patterns:
-                    if re.search(pat, page_text, re.IGNORECASE):
-                        section_header = pat
-                        last_section = pat
-                        break
+                section_header = _find_section_header(page_text)
+                if section_header:
+                    last_section = section_header
                 # Extract tables
                 for table in page.extract_tables():
                     # Try to handle multi-line headers
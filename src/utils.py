@@ -205,6 +205,42 @@ class FinancialCalculator:
 # PDF UTILITIES (from pdf_utils.py)
 # ============================================================================
 
+# Text cleanup and statement patterns, compiled once and reused for every PDF
+_WHITESPACE_RE = re.compile(r'\s+')
+_PAGE_NUMBER_RE = re.compile(r'Page \d+')
+_TRAILING_NUMBER_RE = re.compile(r'\d+\s*$')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.,\-\(\)\%\$\:]')
+_FINANCIAL_STATEMENT_RES = (
+    re.compile(r'(?i)(income statement|profit.*loss)'),
+    re.compile(r'(?i)(balance sheet)'),
+    re.compile(r'(?i)(cash flow|statement.*cash flows)'),
+)
+
+
+
+def build_section_matcher(patterns):
+    """
+    Compile section header patterns into a single alternation.
+    
+    Args:
+        patterns: Header patterns in priority order
+        
+    Returns:
+        (compiled regex, function returning the highest-priority header found in a page's text, or None)
+    """
+    # One alternation, so each page is scanned once rather than once per header
+    section_re = re.compile(r"(" + r"|".join(patterns) + r")", re.IGNORECASE)
+    by_key = {pat.lower(): pat for pat in patterns}
+    
+    def find_section_header(page_text: str) -> Optional[str]:
+        found = {match.group(0).lower() for match in section_re.finditer(page_text)}
+        for key, pat in by_key.items():
+            if key in found:
+                return pat
+        return None
+    
+    return section_re, find_section_header
+
 class PDFProcessor:
     """PDF processing utilities."""
     
@@ -220,15 +256,20 @@ class PDFProcessor:
             Extracted text content
         """
         try:
-            import PyPDF2
-            with open(pdf_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return PDFProcessor.clean_text(text)
+            try:
+                import pymupdf
+            except ImportError:
+                # PyMuPDF parses far faster; PyPDF2 is kept as a pure-Python fallback
+                import PyPDF2
+                with open(pdf_path, 'rb') as file:
+                    reader = PyPDF2.PdfReader(file)
+                    text = "".join(page.extract_text() for page in reader.pages)
+                    return PDFProcessor.clean_text(text)
+            with pymupdf.open(pdf_path) as doc:
+                text = "".join(page.get_text("text") for page in doc)
+            return PDFProcessor.clean_text(text)
         except ImportError:
-            logger.error("PyPDF2 not installed. Install with: pip install PyPDF2")
+            logger.error("No PDF library installed. Install with: pip install pymupdf")
             return ""
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
@@ -276,14 +317,14 @@ class PDFProcessor:
             return ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Remove page numbers and headers/footers (basic patterns)
-        text = re.sub(r'Page \d+', '', text)
-        text = re.sub(r'\d+\s*$', '', text)
+        text = _PAGE_NUMBER_RE.sub('', text)
+        text = _TRAILING_NUMBER_RE.sub('', text)
         
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.,\-\(\)\%\$\:]', '', text)
+        text = _SPECIAL_CHARS_RE.sub('', text)
         
         return text.strip()
 
@@ -301,14 +342,8 @@ class PDFProcessor:
         tables = []
         
         # Look for common financial statement patterns
-        patterns = [
-            r'(?i)(income statement|profit.*loss)',
-            r'(?i)(balance sheet)',
-            r'(?i)(cash flow|statement.*cash flows)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, text)
+        for pattern in _FINANCIAL_STATEMENT_RES:
+            matches = pattern.finditer(text)
             for match in matches:
                 # Extract surrounding context
                 start = max(0, match.start() - 500)
@@ -328,6 +363,66 @@ class PDFProcessor:
 # FALLBACK DATA SERVICE (from fallback_data.py)
 # ============================================================================
 
+# Fallback figures used when annual reports cannot be analyzed; built once, copied per call
+ITC_FALLBACK_DATA = {
+    'company_name': 'ITC Limited',
+    'latest_year': '2025',
+    
+    # Revenue trend (in Crores) - Based on ITC's actual performance
+    'revenue': 68500,  # Latest year
+    'revenue_growth_3yr': 4.6,  # 3-year CAGR
+    
+    # Profitability
+    'net_profit': 17200,
+    'profit_margin': 25.1,
+    'profit_growth_3yr': 6.7,
+    
+    # Cash flows
+    'free_cash_flow': 15800,  # Strong FCF generator
+    'operating_cash_flow': 18500,
+    'fcf_growth_3yr': 7.0,
+    
+    # Balance sheet strength
+    'total_assets': 85000,
+    'shareholders_equity': 58000,
+    'total_debt': 1200,  # Very low debt
+    'cash_and_equivalents': 8500,  # Cash rich
+    'shares_outstanding': 1240,  # 12.40 billion shares
+    
+    # Key financial ratios
+    'roe': 28.5,
+    'roce': 32.1,
+    'roa': 20.2,
+    'debt_to_equity': 0.05,
+    'current_ratio': 2.8,
+    'quick_ratio': 2.1,
+    'asset_turnover': 1.4,
+    
+    # Per share metrics
+    'book_value_per_share': 14.2,
+    'eps': 13.9,
+    
+    # Data quality
+    'data_source': 'ENHANCED_FALLBACK',
+    'analysis_quality': 'HIGH'
+}
+
+GENERIC_FALLBACK_DATA = {
+    'latest_year': '2025',
+    'revenue': 10000,
+    'net_profit': 1500,
+    'free_cash_flow': 1200,
+    'total_debt': 2000,
+    'cash_and_equivalents': 1000,
+    'shares_outstanding': 100,
+    'roe': 15.0,
+    'roce': 18.0,
+    'debt_to_equity': 0.3,
+    'profit_margin': 15.0,
+    'data_source': 'FALLBACK_DATA'
+}
+
+
 class FallbackDataService:
     """Centralized service for generating fallback financial data."""
     
@@ -463,5 +558,8 @@ __all__ = [
     'FinancialStatement',
     'FinancialCalculator',
     'PDFProcessor',
-    'FallbackDataService'
+    'build_section_matcher',
+    'FallbackDataService',
+    'ITC_FALLBACK_DATA',
+    'GENERIC_FALLBACK_DATA'
 ]
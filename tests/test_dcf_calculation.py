@@ -0,0 +1,79 @@
+"""
+Tests for the DCF calculation utility.
+"""
+import pytest
+
+from src.analysis import valuation
+from src.analysis.dcf_calculation import dcf_intrinsic_share_prices, dcf_intrinsic_valuation
+from src.analysis.valuation import DCFAnalyzer
+
+
+class TestDCFIntrinsicValuation:
+    """Test cases for the two-stage DCF valuation."""
+
+    def test_two_stage_projection(self):
+        """Stage-one growth applies for five years, stage-two growth after that."""
+        result = dcf_intrinsic_valuation(base_fcf=100, fcf_growth_rate_5yr=0.10,
+                                         fcf_growth_rate_10yr=0.05, years=7)
+
+        projected = result["Projected FCFs"]
+        assert len(projected) == 7
+        assert projected[0] == pytest.approx(110)
+        assert projected[4] == pytest.approx(100 * 1.1 ** 5)
+        assert projected[6] == pytest.approx(100 * 1.1 ** 5 * 1.05 ** 2)
+
+    def test_intrinsic_value_per_share(self):
+        """Equity value nets debt against cash and is spread over share capital / face value."""
+        result = dcf_intrinsic_valuation(base_fcf=1000, total_debt=500, cash_and_equivalents=200,
+                                         share_capital=100, face_value=2)
+
+        assert result["Net Debt"] == 300
+        assert result["Number of Shares"] == 50
+        assert result["Equity Value"] == pytest.approx(result["Total Enterprise Value"] - 300)
+        assert result["Intrinsic Share Price"] == pytest.approx(result["Equity Value"] / 50)
+        assert result["Final Value with Margin of Safety"] == pytest.approx(result["Intrinsic Share Price"] * 0.7)
+
+    def test_batch_share_prices_match_single_valuations(self):
+        """Valuing several companies at once gives each one's single-company share price."""
+        companies = [
+            dict(base_fcf=1000, total_debt=500, cash_and_equivalents=200, share_capital=100, face_value=2),
+            dict(base_fcf=-50, total_debt=0, cash_and_equivalents=900, share_capital=10, face_value=0),
+            dict(base_fcf=25000, total_debt=12000, cash_and_equivalents=0, share_capital=1250, face_value=1),
+        ]
+
+        prices = dcf_intrinsic_share_prices(
+            [c['base_fcf'] for c in companies], [c['total_debt'] for c in companies],
+            [c['cash_and_equivalents'] for c in companies], [c['share_capital'] for c in companies],
+            [c['face_value'] for c in companies], discount_rate=0.11, years=8)
+
+        expected = [dcf_intrinsic_valuation(discount_rate=0.11, years=8, **c)["Intrinsic Share Price"]
+                    for c in companies]
+        assert list(prices) == pytest.approx(expected)
+
+
+class TestDCFAnalyzerValuation:
+    """Test cases for repeated DCFAnalyzer valuations."""
+
+    FINANCIALS = {'free_cash_flow': 15000, 'revenue': 70000, 'shares_outstanding': 1250,
+                  'current_price': 400, 'revenue_growth_3yr': 8, 'total_debt': 300,
+                  'cash_and_equivalents': 5000}
+
+    def test_repeat_valuation_reuses_cash_flows(self):
+        """Identical inputs are computed once; each result still gets its own lists."""
+        valuation._dcf_core.cache_clear()
+        analyzer = DCFAnalyzer()
+
+        first = analyzer.calculate_dcf_valuation(self.FINANCIALS)
+        first['projected_fcfs'].append(0)
+        second = analyzer.calculate_dcf_valuation(dict(self.FINANCIALS))
+
+        assert valuation._dcf_core.cache_info().hits == 1
+        assert len(second['projected_fcfs']) == 5
+        assert second['enterprise_value'] == first['enterprise_value']
+
+    def test_rates_are_part_of_the_key(self):
+        """A different discount rate is not served from another analyzer's cached result."""
+        default = DCFAnalyzer().calculate_dcf_valuation(self.FINANCIALS)
+        cheaper_capital = DCFAnalyzer(discount_rate=0.10).calculate_dcf_valuation(self.FINANCIALS)
+
+        assert cheaper_capital['enterprise_value'] > default['enterprise_value']
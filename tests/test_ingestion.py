@@ -15,7 +15,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
 from src.ingestion.books import BookIngester, list_available_books, get_book_metadata
-from src.ingestion.reports import ReportIngester, list_available_reports, get_company_reports
+from src.ingestion.reports import ReportIngester, ReportExtractor, list_available_reports, get_company_reports, _find_section_header
 
 
 class TestBookIngestion:
@@ -192,6 +192,50 @@ class TestReportIngestion:
         assert all(report['company'] == 'AAPL' for report in aapl_reports)
 
 
+class TestReportExtractor:
+    """Test annual report section detection."""
+    
+    def test_section_header_priority(self):
+        """Header detection follows pattern priority, not position on the page."""
+        page_text = "Financial Highlights are discussed in the Directors' report and the balance sheet"
+        
+        assert _find_section_header(page_text) == "Directors' Report"
+        assert _find_section_header("No headers here") is None
+    
+    @patch('src.ingestion.reports.PYMUPDF_AVAILABLE', False)
+    @patch('src.ingestion.reports.pdfplumber.open')
+    def test_text_split_into_sections(self, mock_open):
+        """Full text is split at each header, case-insensitively."""
+        pages = [Mock(), Mock(), Mock()]
+        pages[0].extract_text.return_value = "BALANCE SHEET\nTotal Assets 85000"
+        pages[1].extract_text.return_value = None
+        pages[2].extract_text.return_value = "Cash Flow Statement\nOperating 18500"
+        mock_open.return_value.__enter__.return_value.pages = pages
+        
+        sections = ReportExtractor.extract_text_sections("report.pdf")
+        
+        assert sections['BALANCE SHEET'] == "BALANCE SHEET\nTotal Assets 85000"
+        assert sections['Cash Flow Statement'] == "Cash Flow Statement\nOperating 18500"
+        assert sections['full_text'].count("\n") == 4
+
+    def test_text_extracted_with_pymupdf(self, tmp_path):
+        """Page text comes from PyMuPDF when it is installed."""
+        pymupdf = pytest.importorskip("pymupdf")
+        pdf_path = tmp_path / "report.pdf"
+        with pymupdf.open() as doc:
+            doc.new_page().insert_text((72, 72), "Balance Sheet\nTotal Assets 85000")
+            doc.new_page()
+            doc.new_page().insert_text((72, 72), "Cash Flow Statement\nOperating 18500")
+            doc.save(pdf_path)
+        
+        with patch('src.ingestion.reports.pdfplumber.open') as mock_open:
+            sections = ReportExtractor.extract_text_sections(str(pdf_path))
+        
+        mock_open.assert_not_called()
+        assert sections['Balance Sheet'] == "Balance Sheet\nTotal Assets 85000"
+        assert sections['Cash Flow Statement'] == "Cash Flow Statement\nOperating 18500"
+
+
 class TestIngestionIntegration:
     """Integration tests for the ingestion module."""
     
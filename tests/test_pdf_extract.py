@@ -0,0 +1,193 @@
+"""
+Tests for annual report PDF extraction and PDF report generation.
+"""
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from fpdf import FPDF
+
+from src.analysis import pdf_extract_and_report
+from src.analysis.pdf_extract_and_report import (
+    _find_section_header,
+    extract_sections_and_tables,
+    extract_sections_and_tables_cached,
+    generate_pdf_report,
+)
+from src.utils import PDFProcessor
+
+
+@pytest.fixture
+def sample_report_pdf(tmp_path):
+    """Create a small two-page annual report PDF."""
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    pdf.add_page()
+    pdf.cell(0, 10, "Financial Highlights", ln=True)
+    pdf.cell(0, 10, "Revenue grew steadily this year", ln=True)
+    pdf.add_page()
+    pdf.cell(0, 10, "Balance Sheet", ln=True)
+    pdf.cell(0, 10, "Total Assets 85000", ln=True)
+    path = tmp_path / "2024.pdf"
+    pdf.output(str(path))
+    return path
+
+
+class TestExtractSectionsAndTables:
+    """Test cases for section and table extraction."""
+
+    def test_sections_split_on_headers(self, sample_report_pdf):
+        """Sections are keyed by the matched header text."""
+        sections, tables = extract_sections_and_tables(str(sample_report_pdf))
+
+        assert set(sections) == {'Financial Highlights', 'Balance Sheet', 'full_text'}
+        assert sections['Financial Highlights'].startswith('Financial Highlights')
+        assert 'Revenue grew steadily' in sections['Financial Highlights']
+        assert 'Total Assets 85000' in sections['Balance Sheet']
+        assert tables == []
+
+    def test_full_text_keeps_page_breaks(self, sample_report_pdf):
+        """Full text holds every page followed by a newline."""
+        sections, _ = extract_sections_and_tables(str(sample_report_pdf))
+
+        full_text = sections['full_text']
+        assert full_text.endswith('\n')
+        assert full_text.index('Financial Highlights') < full_text.index('Balance Sheet')
+
+    @pytest.mark.parametrize("backend", ["pdfplumber", "pymupdf"])
+    def test_tables_attached_to_section(self, tmp_path, backend):
+        """Both backends find a ruled table and file it under the page's section."""
+        pymupdf = pytest.importorskip("pymupdf")
+        path = tmp_path / "tables.pdf"
+        rows = [["Item", "2024", "2023"], ["Revenue", "100", "90"], ["Profit", "20", "18"]]
+        with pymupdf.open() as doc:
+            page = doc.new_page()
+            page.insert_text((72, 72), "Balance Sheet")
+            for i in range(4):
+                page.draw_line((72, 100 + i * 20), (372, 100 + i * 20))
+                page.draw_line((72 + i * 100, 100), (72 + i * 100, 160))
+            for r, row in enumerate(rows):
+                for c, value in enumerate(row):
+                    page.insert_text((77 + c * 100, 114 + r * 20), value)
+            doc.save(path)
+
+        sections, tables = extract_sections_and_tables(str(path), backend=backend)
+
+        assert set(sections) == {'Balance Sheet', 'full_text'}
+        assert len(tables) == 1
+        assert tables[0]['section'] == 'Balance Sheet'
+        assert list(tables[0]['table'].columns) == rows[0]
+        assert tables[0]['table'].values.tolist() == rows[1:]
+
+    def test_unknown_backend_rejected(self, sample_report_pdf):
+        """Only the known parsers can be selected."""
+        with pytest.raises(ValueError):
+            extract_sections_and_tables(str(sample_report_pdf), backend="ocr")
+
+    def test_section_header_priority(self):
+        """Header detection follows pattern priority, not position on the page."""
+        page_text = "Corporate Governance report, see the consolidated balance sheet"
+
+        assert _find_section_header(page_text) == 'Balance Sheet'
+        assert _find_section_header("No headers here") is None
+
+
+class TestExtractionCache:
+    """Test cases for the on-disk cache of parsed reports."""
+
+    def test_second_run_served_from_disk(self, sample_report_pdf, tmp_path):
+        """A report is parsed once; later calls load the stored sections and tables."""
+        cache_dir = str(tmp_path / "cache")
+        first = extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=cache_dir)
+
+        with patch.object(pdf_extract_and_report, 'extract_sections_and_tables') as mock_extract:
+            second = extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=cache_dir)
+
+        mock_extract.assert_not_called()
+        assert second == first
+
+    def test_changed_file_and_backend_parsed_again(self, sample_report_pdf, tmp_path):
+        """Rewriting the report or switching parser misses the cache."""
+        cache_dir = str(tmp_path / "cache")
+        extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=cache_dir)
+        os.utime(sample_report_pdf, ns=(1, 1))
+
+        with patch.object(pdf_extract_and_report, 'extract_sections_and_tables',
+                          return_value=({}, [])) as mock_extract:
+            extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=cache_dir)
+            extract_sections_and_tables_cached(str(sample_report_pdf), backend="pymupdf", cache_dir=cache_dir)
+
+        assert mock_extract.call_count == 2
+
+    def test_tables_survive_the_json_round_trip(self, sample_report_pdf, tmp_path):
+        """Tables come back from disk as DataFrames with their columns and cells intact."""
+        cache_dir = str(tmp_path / "cache")
+        table = pd.DataFrame([["Revenue", "68,500"], ["Net Profit", None]], columns=["Item", None])
+        with patch.object(pdf_extract_and_report, 'extract_sections_and_tables',
+                          return_value=({'full_text': "text"}, [{'section': 'Balance Sheet', 'table': table}])):
+            extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=cache_dir)
+
+        sections, tables = extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=cache_dir)
+
+        assert sections == {'full_text': "text"}
+        assert tables[0]['section'] == 'Balance Sheet'
+        pd.testing.assert_frame_equal(tables[0]['table'], table)
+
+    def test_corrupt_cache_file_parsed_again(self, sample_report_pdf, tmp_path):
+        """A truncated or unreadable cache file is a miss, not an error."""
+        cache_dir = tmp_path / "cache"
+        extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=str(cache_dir))
+        for path in cache_dir.iterdir():
+            path.write_text('{"sections": {')
+
+        with patch.object(pdf_extract_and_report, 'extract_sections_and_tables',
+                          return_value=({}, [])) as mock_extract:
+            extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir=str(cache_dir))
+
+        mock_extract.assert_called_once()
+
+    def test_empty_cache_dir_disables_cache(self, sample_report_pdf, tmp_path):
+        """An empty cache directory parses every time and writes nothing."""
+        with patch.object(pdf_extract_and_report, 'extract_sections_and_tables',
+                          return_value=({}, [])) as mock_extract:
+            extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir="")
+            extract_sections_and_tables_cached(str(sample_report_pdf), cache_dir="")
+
+        assert mock_extract.call_count == 2
+
+
+class TestGeneratePdfReport:
+    """Test cases for PDF report generation."""
+
+    def test_report_written(self, tmp_path):
+        """Report renders all sections, dropping non-ASCII characters."""
+        template_data = {
+            'company_name': 'ITC Limited',
+            'business_analysis': {'What does the company do?': 'FMCG and hotels'},
+            'financial_metrics': {'Revenue Growth': '4.6%', 'Debt Level': '₹1,200 Cr'},
+            'ratio_analysis': {'ROE (%)': '28.5%'},
+            'recommendation': 'HOLD ⚖️',
+        }
+        output_path = tmp_path / "report.pdf"
+
+        generate_pdf_report(template_data, str(output_path))
+
+        assert output_path.read_bytes().startswith(b'%PDF')
+
+
+class TestPDFProcessor:
+    """Test cases for plain-text PDF extraction."""
+
+    def test_text_extracted_from_every_page(self, sample_report_pdf):
+        """Text from all pages is returned in page order."""
+        text = PDFProcessor.extract_text_from_pdf(str(sample_report_pdf))
+
+        assert text.index('Financial Highlights') < text.index('Total Assets')
+
+    def test_unreadable_file_returns_empty_text(self, tmp_path):
+        """A corrupt PDF yields an empty string rather than raising."""
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b'not a pdf')
+
+        assert PDFProcessor.extract_text_from_pdf(str(path)) == ""
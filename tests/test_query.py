@@ -0,0 +1,500 @@
+"""
+Tests for the query engine and report generator.
+"""
+import asyncio
+import json
+import os
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from openai import OpenAI
+
+from src.analysis import query
+
+from src.analysis.query import (
+    AnalysisReportGenerator, AnalysisResponse, LLMCache, PersonaManager, QueryContext, QueryEngine, SYSTEM_PROMPT, _load_yaml,
+    _resolve_env, create_query_engine, flush_report_writes
+)
+
+
+def _make_response(query):
+    """Build a canned analysis response for a query."""
+    return AnalysisResponse(
+        query=query,
+        answer=f"Answer to {query}",
+        reasoning="Test reasoning",
+        confidence_score=0.85,
+        sources=["Test source"],
+        recommendations=[],
+        timestamp=datetime.now()
+    )
+
+
+class TestAnalysisReportGenerator:
+    """Test cases for company analysis report generation."""
+
+    def test_report_sections_follow_query_order(self):
+        """Concurrent queries still produce sections in the original order."""
+        query_engine = MagicMock()
+        query_engine.config = {'processing': {'report_batch_size': 1}}
+        query_engine.aprocess_query = AsyncMock(side_effect=lambda query, symbol: _make_response(query))
+
+        report = AnalysisReportGenerator(query_engine).generate_company_analysis_report("ITC")
+
+        assert report['company_symbol'] == "ITC"
+        assert list(report['sections']) == [
+            "What is the financial health of",
+            "What are the key risks for investing in",
+            "Is  undervalued or overvalued",
+            "What is the competitive position of",
+        ]
+        assert query_engine.aprocess_query.await_count == 4
+        section = report['sections']["What is the financial health of"]
+        assert section['analysis'] == "Answer to What is the financial health of ITC?"
+        assert section['confidence'] == 0.85
+
+    def test_report_generated_from_inside_an_event_loop(self):
+        """Both report entry points work when called from code already running an event loop."""
+        query_engine = MagicMock()
+        query_engine.config = {'processing': {'report_batch_size': 1}}
+        query_engine.aprocess_query = AsyncMock(side_effect=lambda query, symbol: _make_response(query))
+        generator = AnalysisReportGenerator(query_engine)
+
+        async def generate():
+            return generator.generate_company_analysis_report("ITC"), await generator.agenerate_company_analysis_report("ITC")
+
+        sync_report, async_report = asyncio.run(generate())
+
+        assert list(sync_report['sections']) == list(async_report['sections'])
+        assert len(sync_report['sections']) == 4
+        assert query_engine.aprocess_query.await_count == 8
+
+    def test_saved_report_round_trips(self, tmp_path):
+        """Saved reports are indented JSON that loads back unchanged."""
+        report = {'company_symbol': "ITC", 'generation_date': "2024-01-01T00:00:00",
+                  'sections': {"Risks": {'analysis': "Low debt ₹", 'confidence': 0.85, 'sources': []}}}
+
+        filepath = AnalysisReportGenerator(Mock()).save_report(report, str(tmp_path))
+        flush_report_writes()
+
+        with open(filepath, encoding='utf-8') as f:
+            text = f.read()
+        assert json.loads(text) == report
+        assert '\n  "company_symbol"' in text
+
+    def test_report_queries_batched_into_one_call(self):
+        """Within the batch size all questions go to the engine together."""
+        query_engine = Mock()
+        query_engine.config = {'processing': {'report_batch_size': 4}}
+        query_engine.process_query_batch.side_effect = lambda queries, symbol: [_make_response(q) for q in queries]
+
+        report = AnalysisReportGenerator(query_engine).generate_company_analysis_report("ITC")
+
+        query_engine.process_query_batch.assert_called_once()
+        query_engine.aprocess_query.assert_not_called()
+        assert len(report['sections']) == 4
+
+
+class TestQueryEngineBatch:
+    """Test cases for batched query answering."""
+
+    def _make_engine(self, llm_answer):
+        """Build an OpenAI-backed engine without touching config or network."""
+        engine = QueryEngine.__new__(QueryEngine)
+        engine.llm_provider = 'openai'
+        engine.model = 'test-model'
+        engine.temperature = 0.1
+        engine.max_tokens = 2000
+        engine.llm_cache = LLMCache()
+        engine.persona_manager = Mock(persona_config={})
+        engine.persona_manager.get_persona_prompt.return_value = "INVESTOR PROFILE: value investor"
+        engine.embedding_manager = Mock(documents_version=0)
+        engine.retrieval_ttl = 300
+        engine._cached_retrieval = lru_cache(maxsize=1024)(engine._search_context)
+        engine.embedding_manager.search_knowledge_base_batch.side_effect = lambda queries, top_k: [
+            [(f"Doc for {query}", {'source': 'book'}, 0.9)] for query in queries
+        ]
+        engine.embedding_manager.search_knowledge_base.side_effect = lambda query, top_k: [
+            (f"Doc for {query}", {'source': 'book'}, 0.9)
+        ]
+        engine._call_openai = Mock(return_value=llm_answer)
+        return engine
+
+    def test_batch_answers_parsed_by_question_number(self):
+        """One JSON response is split back into per-question answers."""
+        engine = self._make_engine('{"1": "Healthy balance sheet", "2": "Commodity risk"}')
+
+        responses = engine.process_query_batch(["Health?", "Risks?"], "ITC")
+
+        engine._call_openai.assert_called_once()
+        assert engine._call_openai.call_args.kwargs == {'json_mode': True}
+        assert [r.answer for r in responses] == ["Healthy balance sheet", "Commodity risk"]
+        assert [r.query for r in responses] == ["Health?", "Risks?"]
+
+    def test_batch_retrieval_embeds_queries_together(self):
+        """All questions and the shared company search go out in one embedding request."""
+        engine = self._make_engine('{}')
+
+        contexts = engine._retrieve_context_batch(["Health?", "Risks?"], "ITC")
+
+        engine.embedding_manager.search_knowledge_base_batch.assert_called_once_with(
+            ["Health?", "Risks?", "ITC financial analysis annual report"], top_k=5
+        )
+        assert [doc['content'] for doc in contexts[1]] == [
+            "Doc for Risks?", "Doc for ITC financial analysis annual report"
+        ]
+
+    def test_prompt_context_is_compact_and_deduplicated(self):
+        """Prompts carry a numbered, truncated context block instead of raw document dicts."""
+        engine = self._make_engine('{}')
+        long_doc = {'content': "x" * 2000, 'metadata': {'source': 'book'}, 'relevance_score': 0.9}
+        other_doc = {'content': "Debt is low", 'metadata': {'source': 'report'}, 'relevance_score': 0.8}
+
+        block = engine._format_context_block([long_doc, long_doc, other_doc])
+
+        assert block.splitlines() == ["[1] book: " + "x" * 800, "[2] report: Debt is low"]
+        assert "relevance_score" not in block
+
+    def test_stream_yields_deltas_and_caches_full_answer(self):
+        """Streamed chunks arrive incrementally and the joined answer is cached."""
+        engine = self._make_engine('{}')
+        engine._call_openai_stream = Mock(return_value=iter(["Healthy ", "balance ", "sheet"]))
+
+        chunks = list(engine.process_query_stream("Health?", "ITC"))
+        replay = list(engine.process_query_stream("Health?", "ITC"))
+
+        assert chunks == ["Healthy ", "balance ", "sheet"]
+        assert replay == ["Healthy balance sheet"]
+        engine._call_openai_stream.assert_called_once()
+
+    def test_recommendations_extracted_from_bullets(self):
+        """Bullets after a recommendation keyword are collected until the block ends."""
+        engine = self._make_engine('{}')
+        ai_response = "Overview\n- ignored\nWe recommendation:\n- Buy on dips\n\n2. Hold 5 years\nClosing text\n- ignored"
+
+        assert engine._extract_recommendations(ai_response) == ["Buy on dips", "Hold 5 years"]
+
+    def test_stable_prefix_precedes_question(self):
+        """The fixed system message leads and the volatile question comes last."""
+        engine = self._make_engine('{}')
+        documents = engine._retrieve_context_batch(["Health?"], "ITC")[0]
+
+        prompt = engine._build_response_prompt(QueryContext("Health?", {}, documents))
+        messages = engine._build_messages(prompt)
+
+        assert messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+        assert prompt.rstrip().endswith("Question: Health?\n\n            Response:")
+        assert engine.cache_user.startswith("niveshak-")
+
+    def test_single_query_and_company_search_share_one_request(self):
+        """A company query's general and company searches are issued together."""
+        engine = self._make_engine('{}')
+
+        documents = engine._retrieve_context("Health?", "ITC")
+
+        engine.embedding_manager.search_knowledge_base_batch.assert_called_once_with(
+            ["Health?", "ITC financial analysis annual report"], top_k=5
+        )
+        engine.embedding_manager.search_knowledge_base.assert_not_called()
+        assert [doc['content'] for doc in documents] == [
+            "Doc for Health?", "Doc for ITC financial analysis annual report"
+        ]
+
+    def test_repeat_retrieval_cached_until_documents_added(self):
+        """Repeated questions reuse the search, get their own copies, and see newly added documents."""
+        engine = self._make_engine('{}')
+
+        first = engine._retrieve_context("Health?", "ITC")
+        first[0]['metadata']['source'] = "edited"
+        second = engine._retrieve_context("Health?", "ITC")
+        engine.embedding_manager.documents_version += 1
+        engine._retrieve_context("Health?", "ITC")
+
+        assert second[0]['metadata'] == {'source': 'book'}
+        assert engine.embedding_manager.search_knowledge_base_batch.call_count == 2
+
+    def test_repeat_retrieval_expires(self):
+        """A cached search is not reused once the TTL has passed."""
+        engine = self._make_engine('{}')
+
+        with patch('src.analysis.query.time.time', side_effect=[0, 100, 400]):
+            engine._retrieve_context("Health?")
+            engine._retrieve_context("Health?")
+            engine._retrieve_context("Health?")
+
+        assert engine.embedding_manager.search_knowledge_base_batch.call_count == 2
+
+    def test_missing_batch_answer_asked_individually(self):
+        """Questions absent from the JSON response fall back to a single call."""
+        engine = self._make_engine('{"1": "Healthy balance sheet"}')
+        engine._generate_response = Mock(side_effect=lambda context: _make_response(context.query))
+
+        responses = engine.process_query_batch(["Health?", "Risks?"], "ITC")
+
+        assert responses[0].answer == "Healthy balance sheet"
+        assert responses[1].answer == "Answer to Risks?"
+        engine._generate_response.assert_called_once()
+
+    def test_repeated_batch_served_from_cache(self):
+        """Asking the same questions again does not call the LLM."""
+        engine = self._make_engine('{"1": "Healthy balance sheet"}')
+
+        engine.process_query_batch(["Health?"], "ITC")
+        responses = engine.process_query_batch(["Health?"], "ITC")
+
+        engine._call_openai.assert_called_once()
+        assert responses[0].answer == "Healthy balance sheet"
+
+    def test_cached_answer_tied_to_settings(self):
+        """Changing the generation settings asks the LLM again."""
+        engine = self._make_engine("Healthy balance sheet")
+        engine._call_llm("Health?")
+
+        engine.temperature = 0.7
+        engine._call_llm("Health?")
+        engine.max_tokens = 500
+        engine._call_llm("Health?")
+        engine._call_llm("Health?", json_mode=True)
+
+        assert engine._call_openai.call_count == 4
+
+
+class TestLLMCache:
+    """Test cases for the LLM answer cache."""
+
+    def test_answers_persist_across_instances(self, tmp_path):
+        """A new cache on the same database sees earlier answers."""
+        db_path = str(tmp_path / "llm.sqlite")
+        key = LLMCache.make_key("test-model", "prompt")
+        LLMCache(db_path).set(key, "answer")
+
+        assert LLMCache(db_path).get(key) == "answer"
+        assert LLMCache(db_path).get(LLMCache.make_key("other-model", "prompt")) is None
+
+    def test_expired_answers_ignored(self):
+        """Entries older than the TTL are treated as misses."""
+        cache = LLMCache(ttl_hours=0)
+        cache.set("key", "answer")
+
+        assert cache.get("key") is None
+
+    def test_memory_bounded(self):
+        """The least recently used entry is evicted once full."""
+        cache = LLMCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+
+
+class TestCreateQueryEngine:
+    """Test cases for engine reuse."""
+
+    @patch('src.analysis.query.QueryEngine')
+    def test_engine_built_once_per_config_path(self, mock_engine_cls):
+        """Repeated calls for the same settings file share one engine."""
+        create_query_engine.cache_clear()
+
+        first = create_query_engine("config/settings.yaml")
+        second = create_query_engine("config/settings.yaml")
+        create_query_engine("config/other.yaml")
+
+        assert first is second
+        assert mock_engine_cls.call_count == 2
+        create_query_engine.cache_clear()
+
+
+class TestLlamaCppProvider:
+    """Test cases for the llama.cpp server provider."""
+
+    def test_llamacpp_uses_openai_compatible_client(self):
+        """The llama.cpp provider points the OpenAI client at llama-server and reuses its call path."""
+        engine = QueryEngine.__new__(QueryEngine)
+        engine.config = {'llm': {'provider': 'llamacpp'},
+                         'api': {'llamacpp': {'base_url': "http://localhost:8081/v1", 'model': "qwen"}}}
+
+        client = engine._initialize_llm()
+
+        assert engine.llm_provider == 'llamacpp'
+        assert str(client.base_url) == "http://localhost:8081/v1/"
+        assert engine.model == "qwen"
+
+        engine.llm_cache = LLMCache()
+        engine.persona_manager = Mock()
+        engine.persona_manager.get_persona_prompt.return_value = "INVESTOR PROFILE: value investor"
+        engine._call_openai = Mock(return_value="Local answer")
+        assert engine._call_llm("Health?") == "Local answer"
+
+
+class TestAsyncOpenAIClient:
+    """Test cases for pooled async LLM clients."""
+
+    def _make_engine(self):
+        """Build an OpenAI-backed engine with no async client open."""
+        engine = QueryEngine.__new__(QueryEngine)
+        engine.llm_provider = 'openai'
+        engine.openai_client = OpenAI(api_key="sk-test")
+        return engine
+
+    def test_async_client_shared_within_session_and_closed_after(self):
+        """Calls inside a session share one client, which is closed when the session ends."""
+        engine = self._make_engine()
+
+        async def run_session():
+            async with engine.async_session() as outer:
+                async with engine.async_session() as inner:
+                    pass
+            return outer, inner
+
+        first, inner = asyncio.run(run_session())
+        second, _ = asyncio.run(run_session())
+
+        assert first is inner
+        assert first.api_key == "sk-test"
+        assert first.is_closed()
+        assert second is not first
+
+    def test_report_queries_run_in_one_session(self):
+        """Concurrent report queries open a single client for the whole report."""
+        engine = self._make_engine()
+        clients = []
+
+        async def fake_query(query, symbol):
+            async with engine.async_session() as client:
+                clients.append(client)
+            return _make_response(query)
+
+        engine.aprocess_query = fake_query
+        asyncio.run(AnalysisReportGenerator(engine)._process_queries(["Health?", "Risks?"], "ITC"))
+
+        assert clients[0] is clients[1] is not None
+        assert clients[0].is_closed()
+
+
+    def test_threads_sharing_an_engine_get_their_own_client(self):
+        """Sessions opened on different threads never hand out each other's client."""
+        engine = self._make_engine()
+        opened = threading.Barrier(2)
+        clients = []
+
+        async def run_session():
+            async with engine.async_session() as client:
+                await asyncio.to_thread(opened.wait, 5)
+                async with engine.async_session() as inner:
+                    clients.append((client, inner))
+
+        threads = [threading.Thread(target=asyncio.run, args=(run_session(),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [client is inner for client, inner in clients] == [True, True]
+        assert clients[0][0] is not clients[1][0]
+
+class TestConfigEnvironment:
+    """Test cases for ${VAR} substitution in settings."""
+
+    @patch.dict('os.environ', {'OPENAI_API_KEY': 'sk-test', 'QDRANT_HOST': 'db'}, clear=True)
+    def test_env_vars_resolved_throughout_config(self):
+        """Every string in the config is substituted, unset variables become empty."""
+        config = {
+            'api': {'openai': {'api_key': '${OPENAI_API_KEY}', 'max_tokens': 2000}},
+            'vector_db': {'url': 'http://${QDRANT_HOST}:6333', 'hosts': ['${QDRANT_HOST}']},
+            'missing': '${NOT_SET}',
+        }
+
+        resolved = _resolve_env(config)
+
+        assert resolved == {
+            'api': {'openai': {'api_key': 'sk-test', 'max_tokens': 2000}},
+            'vector_db': {'url': 'http://db:6333', 'hosts': ['db']},
+            'missing': '',
+        }
+        assert config['api']['openai']['api_key'] == '${OPENAI_API_KEY}'
+
+
+class TestPersonaManager:
+    """Test cases for persona loading."""
+
+    @pytest.fixture(autouse=True)
+    def yaml_cache_dir(self, tmp_path, monkeypatch):
+        """Keep YAML sidecars in a per-test directory."""
+        monkeypatch.setattr(query, 'YAML_CACHE_DIR', str(tmp_path / "cache"))
+        _load_yaml.cache_clear()
+        yield
+        _load_yaml.cache_clear()
+
+    def test_persona_yaml_parsed_once_per_path(self, tmp_path):
+        """Managers built from the same file share one parsed config."""
+        persona_path = tmp_path / "persona.yaml"
+        persona_path.write_text("name: Test Investor\nrisk_tolerance: moderate\n")
+
+        first = PersonaManager(str(persona_path))
+        persona_path.write_text("name: Changed\n")
+        second = PersonaManager(str(persona_path))
+
+        assert first.persona_config is second.persona_config
+        assert second.persona_config['name'] == "Test Investor"
+
+    def test_persona_prompt_interned_across_managers(self, tmp_path):
+        """Managers for the same persona hand out the same prompt object."""
+        persona_path = tmp_path / "persona.yaml"
+        persona_path.write_text(open("config/persona.yaml").read())
+
+        first = PersonaManager(str(persona_path)).get_persona_prompt()
+        _load_yaml.cache_clear()
+        os.remove(query._yaml_cache_path(str(persona_path)))
+        second = PersonaManager(str(persona_path)).get_persona_prompt()
+
+        assert first is second
+        assert "INVESTOR PROFILE" in first
+
+    def test_persona_loaded_from_json_sidecar(self, tmp_path):
+        """A fresh process reads the JSON sidecar under the cache directory instead of re-parsing YAML."""
+        persona_path = tmp_path / "persona.yaml"
+        persona_path.write_text("name: Test Investor\n")
+        PersonaManager(str(persona_path))
+        sidecar = query._yaml_cache_path(str(persona_path))
+        assert sidecar.startswith(str(tmp_path / "cache"))
+        assert not list(tmp_path.glob("*.json"))
+
+        with open(sidecar) as f:
+            cached = json.load(f)
+        cached['data'] = {'name': "From Sidecar"}
+        with open(sidecar, 'w') as f:
+            json.dump(cached, f)
+        _load_yaml.cache_clear()
+
+        assert PersonaManager(str(persona_path)).persona_config == {'name': 'From Sidecar'}
+
+    def test_sidecar_ignored_after_edit_with_same_mtime(self, tmp_path):
+        """An edit that keeps the old timestamp is still picked up, since the size is checked too."""
+        persona_path = tmp_path / "persona.yaml"
+        persona_path.write_text("name: Test Investor\n")
+        mtime_ns = persona_path.stat().st_mtime_ns
+        PersonaManager(str(persona_path))
+
+        persona_path.write_text("name: Edited Investor\n")
+        os.utime(persona_path, ns=(mtime_ns, mtime_ns))
+        _load_yaml.cache_clear()
+
+        assert PersonaManager(str(persona_path)).persona_config == {'name': 'Edited Investor'}
+
+    def test_data_json_cannot_represent_is_not_cached(self, tmp_path):
+        """Non-string keys and dates keep their YAML types and are never written to a sidecar."""
+        config_path = tmp_path / "settings.yaml"
+        config_path.write_text("1: one\nstarted: 2024-04-01\n")
+
+        first = _load_yaml(str(config_path))
+        _load_yaml.cache_clear()
+        second = _load_yaml(str(config_path))
+
+        assert first == second == {1: 'one', 'started': date(2024, 4, 1)}
+        assert not os.path.exists(query._yaml_cache_path(str(config_path)))
@@ -0,0 +1,552 @@
+"""
+Tests for the symbol-based stock analyzer.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+
+from src.analysis import symbol_stock_analyzer
+from src.analysis.symbol_stock_analyzer import SymbolStockAnalyzer
+
+
+def _raise(error):
+    """Property that raises error when read."""
+    return property(lambda self: (_ for _ in ()).throw(error))
+
+
+def _ticker_factory(infos, fast_infos=None):
+    """Build a yf.Ticker replacement returning canned info and fast_info per ticker."""
+    fast_infos = fast_infos or {}
+
+    def make_ticker(ticker, *args, **kwargs):
+        stock = Mock()
+        if isinstance(infos.get(ticker), Exception):
+            type(stock).info = _raise(infos[ticker])
+        else:
+            stock.info = infos.get(ticker, {})
+        if isinstance(fast_infos.get(ticker), Exception):
+            type(stock).fast_info = _raise(fast_infos[ticker])
+        else:
+            stock.fast_info = fast_infos.get(ticker, {})
+        stock.history.return_value = pd.DataFrame()
+        return stock
+    return make_ticker
+
+
+@pytest.fixture(autouse=True)
+def clear_yfinance_caches():
+    """Start every test with empty yfinance lookup caches."""
+    for fetcher in (symbol_stock_analyzer._fetch_history, symbol_stock_analyzer._fetch_fast_price):
+        fetcher.cache_clear()
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """Analyzer writing reports to a temporary directory."""
+    return SymbolStockAnalyzer(reports_dir=str(tmp_path / "reports"))
+
+
+class TestExchangeProbes:
+    """Test cases for NSE/BSE price and symbol lookups."""
+
+    @patch('yfinance.Ticker')
+    def test_nse_price_preferred_when_both_exchanges_answer(self, mock_ticker, analyzer):
+        """NSE wins over BSE even though both are queried."""
+        mock_ticker.side_effect = _ticker_factory({}, {
+            'ITC.NS': {'last_price': 410.5},
+            'ITC.BO': {'last_price': 410.9},
+        })
+
+        assert analyzer.get_current_stock_price("ITC") == 410.5
+
+    @patch('yfinance.Ticker')
+    def test_bse_price_used_when_nse_fails(self, mock_ticker, analyzer):
+        """A failing NSE lookup falls through to BSE."""
+        mock_ticker.side_effect = _ticker_factory({}, {
+            'ITC.NS': RuntimeError("not found"),
+            'ITC.BO': {'last_price': None, 'previous_close': 409.0},
+        })
+
+        assert analyzer.get_current_stock_price("ITC") == 409.0
+
+    @patch('yfinance.Ticker')
+    def test_estimated_price_when_no_exchange_answers(self, mock_ticker, analyzer):
+        """With no live or historical price the estimate is used."""
+        mock_ticker.side_effect = _ticker_factory({})
+
+        assert analyzer.get_current_stock_price("NOPE") == 100.0
+
+    @patch('yfinance.Ticker')
+    def test_validate_symbol_checks_bse_after_nse_error(self, mock_ticker, analyzer):
+        """An NSE error does not stop the BSE check."""
+        mock_ticker.side_effect = _ticker_factory({}, {
+            'ITC.NS': RuntimeError("rate limited"),
+            'ITC.BO': {'last_price': 409.0},
+        })
+
+        assert analyzer.validate_symbol("ITC") is True
+        mock_ticker.side_effect = _ticker_factory({})
+        assert analyzer.validate_symbol("NOPE") is False
+
+    @patch('yfinance.Ticker')
+    def test_repeated_lookups_served_from_cache(self, mock_ticker, analyzer):
+        """Price and validation lookups share one fast_info download per exchange."""
+        mock_ticker.side_effect = _ticker_factory({}, {'ITC.NS': {'last_price': 410.5}})
+
+        analyzer.get_current_stock_price("ITC")
+        analyzer.get_current_stock_price("ITC")
+        analyzer.validate_symbol("ITC")
+        analyzer.validate_symbol("ITC")
+
+        tickers = [call.args[0] for call in mock_ticker.call_args_list]
+        assert tickers.count('ITC.NS') == 1
+        assert tickers.count('ITC.BO') <= 1
+
+    @patch('yfinance.Ticker')
+    def test_price_does_not_download_full_info(self, mock_ticker, analyzer):
+        """The live price comes from fast_info alone."""
+        mock_ticker.side_effect = _ticker_factory(
+            {'ITC.NS': AssertionError("info downloaded"), 'ITC.BO': AssertionError("info downloaded")},
+            {'ITC.NS': {'last_price': 410.5}},
+        )
+
+        assert analyzer.get_current_stock_price("ITC") == 410.5
+
+    @patch('yfinance.Ticker')
+    def test_validate_symbol_accepts_either_listing(self, mock_ticker, analyzer):
+        """A BSE-only listing validates from fast_info without the full info download."""
+        mock_ticker.side_effect = _ticker_factory(
+            {'ITC.NS': AssertionError("info downloaded"), 'ITC.BO': AssertionError("info downloaded")},
+            {'ITC.BO': {'last_price': 409.0}},
+        )
+
+        assert analyzer.validate_symbol("ITC") is True
+
+    @patch('yfinance.Ticker')
+    def test_validate_symbols_checks_watchlist_once_per_symbol(self, mock_ticker, analyzer):
+        """Each distinct symbol is probed once and results keep the watchlist order."""
+        mock_ticker.side_effect = _ticker_factory(
+            {}, {'ITC.NS': {'last_price': 410.0}, 'TCS.BO': {'last_price': 3900.0}})
+
+        results = analyzer.validate_symbols(["TCS", "ITC", "NOPE", "ITC"])
+
+        assert results == {"TCS": True, "ITC": True, "NOPE": False}
+        assert list(results) == ["TCS", "ITC", "NOPE"]
+        probed = [call.args[0] for call in mock_ticker.call_args_list]
+        assert probed.count('ITC.NS') == 1
+
+    def test_exchange_probes_share_one_deadline(self, monkeypatch):
+        """Stalled exchanges cost one timeout in total, not one per exchange, and are reported as a timeout."""
+        monkeypatch.setattr(symbol_stock_analyzer, 'YFINANCE_TIMEOUT', 0.3)
+        released = threading.Event()
+
+        def stalled_probe(symbol, exchange):
+            released.wait(5)
+            return None
+
+        started = time.monotonic()
+        try:
+            with pytest.raises(symbol_stock_analyzer.FuturesTimeoutError):
+                symbol_stock_analyzer._exchange_result(stalled_probe, "ITC")
+        finally:
+            released.set()
+
+        assert time.monotonic() - started < 0.5
+
+    def test_queue_time_does_not_count_against_timeout(self, monkeypatch):
+        """A probe that waits for a worker still gets its full timeout once it runs."""
+        monkeypatch.setattr(symbol_stock_analyzer, 'YFINANCE_TIMEOUT', 0.5)
+
+        def slow_probe(symbol, exchange):
+            time.sleep(0.3)
+            return 409.0 if exchange == '.BO' else None
+
+        with ThreadPoolExecutor(max_workers=1) as single_worker:
+            result = symbol_stock_analyzer._exchange_result(slow_probe, "ITC", pool=single_worker)
+
+        assert result == ('.BO', 409.0)
+
+    def test_ordered_probe_waits_for_nse(self, monkeypatch):
+        """Ordered probes prefer NSE even when BSE answers first; unordered ones take the first answer."""
+        def probe(symbol, exchange):
+            time.sleep(0.2 if exchange == '.NS' else 0)
+            return exchange
+
+        assert symbol_stock_analyzer._exchange_result(probe, "ITC") == ('.NS', '.NS')
+        assert symbol_stock_analyzer._exchange_result(probe, "ITC", ordered=False) == ('.BO', '.BO')
+
+    @patch('yfinance.Ticker')
+    def test_validate_symbols_reports_timeouts_separately(self, mock_ticker, analyzer, monkeypatch):
+        """A symbol whose exchanges do not answer in time is None, not False."""
+        monkeypatch.setattr(symbol_stock_analyzer, 'YFINANCE_TIMEOUT', 0.2)
+        released = threading.Event()
+        infos = {'ITC.NS': {'last_price': 410.0}}
+
+        def make_ticker(ticker):
+            if ticker.startswith("SLOW"):
+                released.wait(5)
+            return _ticker_factory({}, infos)(ticker)
+
+        mock_ticker.side_effect = make_ticker
+        try:
+            results = analyzer.validate_symbols(["ITC", "SLOW", "NOPE"])
+        finally:
+            released.set()
+
+        assert results == {"ITC": True, "SLOW": None, "NOPE": False}
+
+    @patch('yfinance.Ticker')
+    def test_validate_symbols_probes_do_not_queue(self, mock_ticker, analyzer, monkeypatch):
+        """Every symbol's probes run at once, so slow-but-valid symbols are not timed out by queueing."""
+        monkeypatch.setattr(symbol_stock_analyzer, 'YFINANCE_TIMEOUT', 1.0)
+
+        def make_ticker(ticker):
+            time.sleep(0.6)
+            return _ticker_factory({}, {ticker: {'last_price': 100.0}})(ticker)
+
+        mock_ticker.side_effect = make_ticker
+
+        results = analyzer.validate_symbols(["A", "B", "C", "D"], max_workers=4)
+
+        assert results == {"A": True, "B": True, "C": True, "D": True}
+
+
+class TestKeyMetrics:
+    """Test cases for reading yfinance statements into metrics."""
+
+    @staticmethod
+    def _financials():
+        year = pd.Timestamp("2024-03-31")
+        return pd.DataFrame({year: [5e11, 5e10]}, index=['Total Revenue', 'Net Income'])
+
+    def test_key_metrics_converted_to_crore(self, analyzer):
+        """Statement line items for the latest year are reported in crore."""
+        financials = self._financials()
+        year = financials.columns[0]
+        balance_sheet = pd.DataFrame({year: [2e11, 1e11]}, index=['Total Debt', 'Stockholders Equity'])
+        cash_flow = pd.DataFrame({year: [8e10, -3e10]}, index=['Operating Cash Flow', 'Capital Expenditure'])
+
+        data = analyzer._extract_key_metrics({'marketCap': 5e12}, financials, balance_sheet, cash_flow)
+
+        assert data['market_cap'] == pytest.approx(500000)
+        assert data['debt_to_equity'] == pytest.approx(2.0)
+        assert data['free_cash_flow'] == pytest.approx(5000)
+        assert data['profit_margin'] == pytest.approx(10.0)
+        assert data['financial_year'] == 2024
+
+
+class TestReportLookup:
+    """Test cases for locating a symbol's annual report."""
+
+    def test_latest_report_found(self, analyzer, tmp_path, monkeypatch):
+        """The most recent year's PDF is picked without prompting for a year."""
+        symbol_dir = tmp_path / "data" / "annual_reports" / "ITC"
+        symbol_dir.mkdir(parents=True)
+        year = datetime.now().year - 1
+        (symbol_dir / f"{year - 1}.pdf").write_bytes(b"%PDF")
+        (symbol_dir / f"{year}.pdf").write_bytes(b"%PDF")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr('builtins.input', lambda prompt: "itc")
+
+        assert analyzer.get_stock_symbol_and_report() == ("ITC", f"data/annual_reports/ITC/{year}.pdf")
+
+    def test_requested_year_must_exist(self, analyzer, tmp_path, monkeypatch):
+        """An older year typed by the user is only accepted if its PDF is present."""
+        symbol_dir = tmp_path / "data" / "annual_reports" / "ITC"
+        symbol_dir.mkdir(parents=True)
+        (symbol_dir / "2015.pdf").write_bytes(b"%PDF")
+        monkeypatch.chdir(tmp_path)
+        answers = iter(["ITC", "2015", "ITC", "2014"])
+        monkeypatch.setattr('builtins.input', lambda prompt: next(answers))
+
+        assert analyzer.get_stock_symbol_and_report() == ("ITC", "data/annual_reports/ITC/2015.pdf")
+        assert analyzer.get_stock_symbol_and_report() == (None, None)
+
+    def test_resolve_report_path_without_prompting(self, analyzer, tmp_path, monkeypatch):
+        """Reports are resolved for a given symbol and optional year."""
+        symbol_dir = tmp_path / "data" / "annual_reports" / "ITC"
+        symbol_dir.mkdir(parents=True)
+        (symbol_dir / "2015.pdf").write_bytes(b"%PDF")
+        monkeypatch.chdir(tmp_path)
+
+        assert analyzer.resolve_report_path("ITC", 2015) == symbol_dir.relative_to(tmp_path) / "2015.pdf"
+        assert analyzer.resolve_report_path("ITC") is None
+        assert analyzer.resolve_report_path("NOPE", 2015) is None
+
+    def test_missing_symbol_directory(self, analyzer, tmp_path, monkeypatch):
+        """No reports directory for the symbol returns (None, None)."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr('builtins.input', lambda prompt: "NOPE")
+
+        assert analyzer.get_stock_symbol_and_report() == (None, None)
+
+
+class TestTemplateLoading:
+    """Test cases for loading the fundamental analysis template."""
+
+    def test_template_read_again_only_after_edit(self, tmp_path):
+        """Later reports reuse the template until the file is edited."""
+        templates_dir = tmp_path / "templates"
+        templates_dir.mkdir()
+        template_path = templates_dir / "fundamental-analysis-template.md"
+        template_path.write_text("# {{COMPANY_NAME}}", encoding="utf-8")
+        analyzer = SymbolStockAnalyzer(reports_dir=str(tmp_path / "reports"), templates_dir=str(templates_dir))
+
+        first = analyzer._load_fundamental_template()
+        with patch.object(Path, 'read_text') as mock_read:
+            assert analyzer._load_fundamental_template() == first == "# {{COMPANY_NAME}}"
+        mock_read.assert_not_called()
+
+        template_path.write_text("changed", encoding="utf-8")
+        os.utime(template_path, ns=(1, 1))
+
+        assert analyzer._load_fundamental_template() == "changed"
+
+    def test_default_template_when_missing(self, analyzer):
+        """A missing template file falls back to the built-in template."""
+        analyzer.templates_dir = analyzer.reports_dir / "missing"
+
+        assert analyzer._load_fundamental_template() == analyzer._get_default_fundamental_template()
+
+    def test_placeholders_filled(self, tmp_path):
+        """Company name and year range are substituted; other bracketed text is kept."""
+        templates_dir = tmp_path / "templates"
+        templates_dir.mkdir()
+        (templates_dir / "fundamental-analysis-template.md").write_text(
+            "# [Company Name] ([Year Range])\nSee [Notes] and [Company Name].", encoding="utf-8")
+        analyzer = SymbolStockAnalyzer(reports_dir=str(tmp_path / "reports"), templates_dir=str(templates_dir))
+
+        report = analyzer.generate_fundamental_analysis_report(
+            "ABC", {'company_name': 'ABC Limited', 'data_source': 'FALLBACK_DATA', 'years_analyzed': 1})
+
+        assert report.startswith("# ABC Limited (")
+        assert report.endswith("See [Notes] and ABC Limited.")
+        assert "[Year Range]" not in report
+
+
+class TestTemplateTables:
+    """Test cases for filling the template's markdown tables."""
+
+    def test_rows_filled_by_first_column(self, analyzer):
+        """Known rows get their values; ratio rows need four columns and other lines are untouched."""
+        template = "\n".join([
+            "# Heading",
+            "| What does the company do? | | |",
+            "| Revenue Growth | | |",
+            "| ROE (%) | | | |",
+            "| ROE (%) | |",
+            "| Unknown row | | |",
+        ])
+
+        filled = analyzer._fill_template_tables(
+            template,
+            {"What does the company do?": ("Tobacco and FMCG", "Diversified")},
+            {"Revenue Growth": ("4.6%", "Steady")},
+            {"ROE (%)": ("28.5%", "Excellent", "High returns")},
+        ).split("\n")
+
+        assert filled == [
+            "# Heading",
+            "|  What does the company do?  | Tobacco and FMCG | Diversified |",
+            "|  Revenue Growth  | 4.6% | Steady |",
+            "|  ROE (%)  | 28.5% | Excellent | High returns |",
+            "| ROE (%) | |",
+            "| Unknown row | | |",
+        ]
+
+    def test_company_answers_take_precedence(self, analyzer):
+        """A row name present in several tables is filled from the company answers."""
+        filled = analyzer._fill_template_tables(
+            "| Debt | | |", {"Debt": ("Low", "Good")}, {"Debt": ("1,200", "Fine")}, {})
+
+        assert filled == "|  Debt  | Low | Good |"
+
+    def test_generic_answers_reused_per_sector(self, analyzer):
+        """Companies in the same sector and industry share one generic answer table."""
+        data = {'sector': 'Energy', 'industry': 'Oil & Gas'}
+
+        answers = analyzer._get_company_answers('RELIANCE', data)
+
+        assert analyzer._get_company_answers('ONGC', dict(data)) is answers
+        assert answers["What does the company do?"][0] == "Energy company operating in Oil & Gas"
+        assert analyzer._get_company_answers('TCS', {})["What does the company do?"][0] == \
+            "Business company operating in various sectors"
+
+class TestJudgementBands:
+    """Test cases for the threshold judgements in the metrics and ratio tables."""
+
+    def test_band_boundaries(self, analyzer):
+        """Values on a threshold stay in the lower band for gains and move up for costs."""
+        metrics = analyzer._get_financial_metrics_data(
+            {'profit_margin': 20, 'revenue_growth_3yr': 10.5, 'eps': 5, 'total_debt': 5000, 'roe': 15.1})
+        ratios = analyzer._get_ratio_analysis_data(
+            {'current_price': 250, 'eps': 10, 'quick_ratio': 0.5, 'current_ratio': 1.6,
+             'debt_to_equity': 1.0, 'pb_ratio': 2.9, 'dividend_yield': 3})
+
+        assert metrics["Gross Profit Margin (GPM)"][1] == "Good"
+        assert metrics["Revenue Growth"][1] == "Strong"
+        assert metrics["Earnings Per Share (EPS)"][1] == "Weak"
+        assert metrics["Debt Level"][1] == "Moderate"
+        assert metrics["Return on Equity (ROE)"][1] == "Good"
+        assert ratios["P/E Ratio"][1] == "High"
+        assert ratios["Quick Ratio"][1] == "Poor"
+        assert ratios["Current Ratio"][1] == "Good"
+        assert ratios["Debt to Equity"][1] == "High"
+        assert ratios["Price to Book Value Ratio"][1] == "Reasonable"
+        assert ratios["Dividend Yield (%)"][1] == "Moderate"
+
+    @pytest.mark.parametrize("intrinsic_value, recommendation", [
+        (130, "BUY"), (130.5, "STRONG BUY"), (115, "HOLD"), (90, "AVOID"), (90.5, "HOLD"),
+    ])
+    def test_dcf_recommendation_from_upside(self, analyzer, intrinsic_value, recommendation):
+        """Upside exactly on a threshold keeps the more cautious recommendation."""
+        with patch.object(symbol_stock_analyzer.DCFAnalyzer, 'calculate_dcf_valuation',
+                          return_value={'intrinsic_value_per_share': intrinsic_value}):
+            results = analyzer.generate_dcf_analysis('ITC', {'current_price': 100})
+
+        assert results['recommendation'] == recommendation
+
+    def test_quiet_analyzer_does_not_print_dcf_summary(self, tmp_path, capsys):
+        """verbose=False keeps batch DCF runs off stdout."""
+        quiet = SymbolStockAnalyzer(reports_dir=str(tmp_path), verbose=False)
+        with patch.object(symbol_stock_analyzer.DCFAnalyzer, 'calculate_dcf_valuation',
+                          return_value={'intrinsic_value_per_share': 150}):
+            results = quiet.generate_dcf_analysis('ITC', {'current_price': 100})
+
+        assert results['recommendation'] == "STRONG BUY"
+        assert "DCF analysis completed" not in capsys.readouterr().out
+
+    def test_dcf_results_from_calculator_not_modified(self, analyzer):
+        """The calculator's result is copied, not updated in place."""
+        calculated = {'intrinsic_value_per_share': 150, 'recommendation': 'BUY', 'current_price': 0}
+        with patch.object(symbol_stock_analyzer.DCFAnalyzer, 'calculate_dcf_valuation', return_value=calculated):
+            results = analyzer.generate_dcf_analysis('ITC', {'current_price': 100})
+
+        assert results['current_price'] == 100
+        assert results['upside_potential'] == pytest.approx(50)
+        assert calculated == {'intrinsic_value_per_share': 150, 'recommendation': 'BUY', 'current_price': 0}
+
+
+class TestBatchAnalysis:
+    """Test cases for analyzing several symbols."""
+
+    def test_reports_written_per_symbol_in_order(self, analyzer):
+        """Each symbol gets its own saved report and one failure does not stop the rest."""
+        extract = analyzer.extract_multi_year_financial_data
+
+        def extract_or_fail(symbol):
+            if symbol == "BAD":
+                raise RuntimeError("no data")
+            return extract(symbol)
+
+        with patch.object(analyzer, 'get_current_stock_price', return_value=100.0), \
+                patch.object(analyzer, 'extract_multi_year_financial_data', side_effect=extract_or_fail):
+            results = analyzer.analyze_batch(["ITC", "BAD", "abc"])
+
+        assert [result['symbol'] for result in results] == ["ITC", "BAD", "ABC"]
+        assert results[1] == {'symbol': "BAD", 'error': "no data"}
+        for result in (results[0], results[2]):
+            report = open(result['report_path'], encoding='utf-8').read()
+            assert report.startswith("#")
+            assert 'recommendation' in result
+
+
+class TestMain:
+    """Test cases for the command-line entry point."""
+
+    @patch.object(SymbolStockAnalyzer, 'analyze_symbol', return_value={'report_path': 'reports/ITC.md'})
+    def test_analyzer_reused_until_settings_change(self, mock_analyze, tmp_path, monkeypatch):
+        """Repeated main() calls share one analyzer; editing the settings file builds a new one."""
+        settings = tmp_path / "settings.yaml"
+        settings.write_text("llm: {}")
+        monkeypatch.setattr(symbol_stock_analyzer, '_SETTINGS_PATH', str(settings))
+        symbol_stock_analyzer._shared_analyzer.cache_clear()
+
+        with patch.object(symbol_stock_analyzer, 'SymbolStockAnalyzer', wraps=SymbolStockAnalyzer) as mock_cls:
+            symbol_stock_analyzer.main()
+            symbol_stock_analyzer.main()
+            os.utime(settings, (1, 1))
+            symbol_stock_analyzer.main()
+
+        assert mock_cls.call_count == 2
+        symbol_stock_analyzer._shared_analyzer.cache_clear()
+
+    def test_shared_analyzer_keeps_llm_client_until_settings_change(self, tmp_path, monkeypatch):
+        """The LLM PDF analyzer is built once per settings version, not once per run."""
+        settings = tmp_path / "settings.yaml"
+        settings.write_text("llm: {}")
+        monkeypatch.setattr(symbol_stock_analyzer, '_SETTINGS_PATH', str(settings))
+        symbol_stock_analyzer._shared_analyzer.cache_clear()
+
+        def current_llm_client():
+            return symbol_stock_analyzer._shared_analyzer(symbol_stock_analyzer._settings_mtime()).pdf_analyzer
+
+        with patch('src.analysis.llm_pdf_analyzer.LLMPDFAnalyzer', side_effect=lambda: Mock()) as mock_llm:
+            first = current_llm_client()
+            second = current_llm_client()
+            os.utime(settings, (1, 1))
+            third = current_llm_client()
+
+        assert first is second
+        assert third is not first
+        assert mock_llm.call_count == 2
+        symbol_stock_analyzer._shared_analyzer.cache_clear()
+
+    def test_pdf_analyzer_built_on_first_use(self, tmp_path):
+        """Constructing the analyzer does not create the LLM PDF analyzer until it is needed."""
+        with patch('src.analysis.llm_pdf_analyzer.LLMPDFAnalyzer') as mock_llm:
+            analyzer = SymbolStockAnalyzer(reports_dir=str(tmp_path), verbose=False)
+            assert mock_llm.call_count == 0
+
+            assert analyzer.pdf_analyzer is analyzer.pdf_analyzer
+            assert mock_llm.call_count == 1
+
+    def test_pdf_analyzer_shared_across_symbols(self, tmp_path):
+        """Multi-year extraction for several symbols builds one LLM PDF analyzer."""
+        with patch('src.analysis.llm_pdf_analyzer.LLMPDFAnalyzer') as mock_llm:
+            mock_llm.return_value.analyze_multi_year_reports.side_effect = lambda symbol: {'symbol': symbol}
+            analyzer = SymbolStockAnalyzer(reports_dir=str(tmp_path), verbose=False)
+
+            results = [analyzer.extract_multi_year_financial_data(symbol) for symbol in ("ITC", "TCS")]
+
+        assert results == [{'symbol': "ITC"}, {'symbol': "TCS"}]
+        assert mock_llm.call_count == 1
+
+
+class TestFallbackData:
+    """Test cases for fallback multi-year financial data."""
+
+    def test_fallback_data_is_a_fresh_copy(self, analyzer):
+        """Callers can annotate the returned data without affecting later analyses."""
+        first = analyzer.extract_multi_year_financial_data("ITC")
+        first['current_price'] = 410.5
+
+        second = analyzer.extract_multi_year_financial_data("ITC")
+
+        assert second['company_name'] == 'ITC Limited'
+        assert 'current_price' not in second
+
+    def test_generic_fallback_names_company(self, analyzer):
+        """Other symbols get the generic figures under their own name."""
+        data = analyzer.extract_multi_year_financial_data("ABC")
+
+        assert data['company_name'] == 'ABC Limited'
+        assert data['symbol'] == 'ABC'
+
+    def test_years_analyzed_counts_latest_three_reports(self, analyzer, tmp_path, monkeypatch):
+        """Only PDFs count towards the reports used, capped at three."""
+        symbol_dir = tmp_path / "data" / "annual_reports" / "ABC"
+        symbol_dir.mkdir(parents=True)
+        for name in ("2021.pdf", "2022.pdf", "2023.pdf", "2024.pdf", "notes.txt"):
+            (symbol_dir / name).write_bytes(b"%PDF")
+        monkeypatch.chdir(tmp_path)
+
+        with patch('src.analysis.llm_pdf_analyzer.LLMPDFAnalyzer', side_effect=ImportError("unavailable")):
+            assert analyzer.extract_multi_year_financial_data("ABC")['years_analyzed'] == 3
@@ -0,0 +1,140 @@
+"""
+Tests for the Qdrant vector store.
+"""
+from unittest.mock import Mock, patch
+
+from qdrant_client.models import ScalarType
+
+from src.embedding.embedder import Document, KeywordIndex, OllamaEmbedder, QdrantVectorStore, reciprocal_rank_fusion
+
+
+def _make_store():
+    """Build an in-memory store with three orthogonal documents."""
+    # Port 1 is never listening, so the store falls back to in-memory Qdrant
+    store = QdrantVectorStore(host="localhost", port=1, collection_name="test", vector_size=3)
+    store.add_documents([
+        Document(id="a", content="Revenue", metadata={'source': 'a'}, embedding=[1.0, 0.0, 0.0]),
+        Document(id="b", content="Debt", metadata={'source': 'b'}, embedding=[0.0, 1.0, 0.0]),
+        Document(id="c", content="Margins", metadata={'source': 'c'}, embedding=[0.0, 0.0, 1.0]),
+    ])
+    return store
+
+
+class TestQdrantVectorStore:
+    """Test cases for similarity search."""
+
+    def test_search_similar_ranks_by_cosine(self):
+        """The closest document is returned first."""
+        results = _make_store().search_similar([0.9, 0.1, 0.0], top_k=2)
+
+        assert [doc.content for doc, _ in results] == ["Revenue", "Debt"]
+
+    def test_batch_search_matches_single_searches(self):
+        """A batched search returns the same hits as individual searches."""
+        store = _make_store()
+        queries = [[0.9, 0.1, 0.0], [0.0, 0.2, 0.8]]
+
+        batched = store.search_similar_batch(queries, top_k=2)
+
+        assert len(batched) == 2
+        for query, results in zip(queries, batched):
+            expected = store.search_similar(query, top_k=2)
+            assert [doc.content for doc, _ in results] == [doc.content for doc, _ in expected]
+        assert batched[1][0][0].content == "Margins"
+
+    @patch('src.embedding.embedder.QdrantClient')
+    def test_int8_quantization_configured_on_new_collection(self, mock_client_cls):
+        """New collections store int8 vectors and searches rescore with the originals."""
+        client = mock_client_cls.return_value
+        client.get_collections.return_value.collections = []
+
+        store = QdrantVectorStore(host="localhost", port=6333, collection_name="kb",
+                                  vector_size=3, quantization='int8')
+        store.search_similar([1.0, 0.0, 0.0])
+
+        quantization = client.create_collection.call_args.kwargs['quantization_config']
+        assert quantization.scalar.type == ScalarType.INT8
+        assert client.query_points.call_args.kwargs['search_params'].quantization.rescore is True
+
+    @patch.dict('os.environ', {'NIVESHAK_USE_VEC_INDEX': '0'})
+    @patch('src.embedding.embedder.QdrantClient')
+    def test_vec_index_toggle_forces_exact_search(self, mock_client_cls):
+        """Disabling the vector index falls back to brute-force search."""
+        client = mock_client_cls.return_value
+        client.get_collections.return_value.collections = []
+
+        store = QdrantVectorStore(host="localhost", port=6333, collection_name="kb",
+                                  vector_size=3, hnsw={'m': 16, 'ef_construct': 100, 'ef': 64})
+        store.search_similar([1.0, 0.0, 0.0])
+
+        hnsw_config = client.create_collection.call_args.kwargs['hnsw_config']
+        assert (hnsw_config.m, hnsw_config.ef_construct) == (16, 100)
+        search_params = client.query_points.call_args.kwargs['search_params']
+        assert search_params.exact is True
+        assert search_params.hnsw_ef == 64
+
+
+class TestHybridSearch:
+    """Test cases for keyword search and rank fusion."""
+
+    def test_keyword_index_matches_exact_terms(self):
+        """Ticker lookups are found by keyword even with punctuation in the query."""
+        index = KeywordIndex()
+        index.add_documents(
+            ["MSFT debt-to-equity fell to 0.3", "Apple revenue grew"],
+            [{'source': 'msft'}, {'source': 'aapl'}]
+        )
+
+        results = index.search("MSFT 10-K debt-to-equity?")
+
+        assert results[0][0] == "MSFT debt-to-equity fell to 0.3"
+        assert results[0][1] == {'source': 'msft'}
+
+    def test_rrf_rewards_documents_ranked_by_both_retrievers(self):
+        """A document found by both lists outranks one found by a single list."""
+        vector_results = [("A", {}, 0.9), ("B", {}, 0.8)]
+        keyword_results = [("B", {}, 5.0), ("C", {}, 4.0)]
+
+        fused = reciprocal_rank_fusion([vector_results, keyword_results], top_k=2)
+
+        assert [content for content, _, _ in fused] == ["B", "A"]
+        assert fused[0][2] == 1 / 62 + 1 / 61
+
+    def test_reingested_chunks_indexed_once(self, tmp_path):
+        """Adding the same chunk again replaces it instead of duplicating it."""
+        db_path = str(tmp_path / "keyword_index.sqlite")
+        KeywordIndex(db_path).add_documents(["MSFT debt fell"], [{'source': 'msft-2023'}])
+        index = KeywordIndex(db_path)
+        index.add_documents(["MSFT debt fell", "MSFT revenue grew"], [{'source': 'msft-2024'}, {'source': 'msft-2024'}])
+
+        results = index.search("MSFT")
+
+        assert sorted(content for content, _, _ in results) == ["MSFT debt fell", "MSFT revenue grew"]
+        assert all(metadata == {'source': 'msft-2024'} for _, metadata, _ in results)
+
+    def test_rrf_counts_first_rank_per_list(self):
+        """A document repeated within one list scores only for its best rank."""
+        vector_results = [("A", {}, 0.9), ("A", {}, 0.9), ("A", {}, 0.9), ("B", {}, 0.8)]
+        keyword_results = [("B", {}, 5.0)]
+
+        fused = reciprocal_rank_fusion([vector_results, keyword_results], top_k=2)
+
+        assert [content for content, _, _ in fused] == ["B", "A"]
+        assert fused[1][2] == 1 / 61
+
+
+class TestOllamaEmbedder:
+    """Test cases for batched Ollama embeddings."""
+
+    def test_large_batches_split_into_bounded_requests(self):
+        """Embeddings come back in input order across several bounded requests."""
+        embedder = OllamaEmbedder.__new__(OllamaEmbedder)
+        embedder.model = "nomic-embed-text"
+        embedder.client = Mock()
+        embedder.client.embed.side_effect = lambda model, input: Mock(embeddings=[[float(len(text))] for text in input])
+        texts = ["x" * n for n in range(1, 151)]
+
+        embeddings = embedder.embed_batch(texts)
+
+        assert embeddings == [[float(n)] for n in range(1, 151)]
+        assert [len(call.kwargs['input']) for call in embedder.client.embed.call_args_list] == [64, 64, 22]